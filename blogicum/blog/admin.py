@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
-from blog.models import Category, Comment, Location, Post
+from blog.models import Category, Comment, Location, Post, Tag
 
 admin.site.empty_value_display = 'Не задано'
 
@@ -42,6 +42,7 @@ class PostAdmin(admin.ModelAdmin):
         'location',
         'category',
         'is_published',
+        'views',
         'created_at',
         'image_icon',
     )
@@ -79,11 +80,20 @@ class PostAdmin(admin.ModelAdmin):
                     'category',
                     'pub_date',
                     'image',
+                    'tags',
                 )
             },
         ),
     )
 
+    filter_horizontal = ('tags',)
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            obj.save_without_views()
+        else:
+            obj.save()
+
     def image_icon(self, object):
         if object.image:
             return format_html(
@@ -93,6 +103,17 @@ class PostAdmin(admin.ModelAdmin):
     image_icon.short_description = 'Изображение'
 
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = (
+        'name',
+        'slug',
+        'post_count',
+    )
+    search_fields = ('name',)
+    prepopulated_fields = {'slug': ('name',)}
+
+
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     list_display = (
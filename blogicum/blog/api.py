@@ -0,0 +1,244 @@
+from django.core.files.storage import default_storage
+from django.db.models import Count, Q
+from django.http import Http404, JsonResponse
+from django.views import View
+
+from blog.cache import get_published_categories
+from blog.consts import API_MAX_LIMIT, POSTS_ON_PAGE
+from blog.cursors import InvalidCursor, decode_cursor, encode_cursor
+from blog.models import Comment, Location, Post
+from blog.purge import POSTS_KEY, post_key, set_surrogate_keys
+
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'excerpt': 'excerpt',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'created_at': 'created_at',
+    'author': 'author__username',
+}
+
+
+class ApiError(Exception):
+    pass
+
+
+class ApiView(View):
+    """Базовое представление API: ошибки тоже отдаются в JSON."""
+
+    fields = {}
+    default_fields = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except (ApiError, InvalidCursor) as error:
+            return self.render({'error': str(error)}, status=400)
+        except Http404:
+            return self.render({'error': 'Не найдено.'}, status=404)
+        return set_surrogate_keys(response, self.get_surrogate_keys())
+
+    def get_surrogate_keys(self):
+        return {POSTS_KEY}
+
+    def render(self, data, status=200):
+        return JsonResponse(
+            data, status=status, json_dumps_params={'ensure_ascii': False}
+        )
+
+    def get_field_names(self):
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return self.default_fields
+        names = tuple(name.strip() for name in requested.split(','))
+        unknown = set(names) - set(self.fields)
+        if unknown:
+            raise ApiError(
+                'Неизвестные поля: ' + ', '.join(sorted(unknown)) + '.'
+            )
+        return names
+
+    def get_lookups(self, names):
+        return {self.fields[name] for name in names}
+
+    def serialize(self, row, names):
+        return {name: row[self.fields[name]] for name in names}
+
+
+class ApiListView(ApiView):
+    """Список объектов с курсорной пагинацией.
+
+    Строки выбираются через values(), без создания экземпляров моделей.
+    Курсор — пара (дата, id) последнего элемента страницы.
+    """
+
+    date_field = None
+    descending = True
+
+    def get(self, request, *args, **kwargs):
+        names = self.get_field_names()
+        limit = self.get_limit()
+        queryset = self.get_queryset()
+        cursor = request.GET.get('cursor')
+        if cursor:
+            queryset = queryset.filter(self.after(*decode_cursor(cursor)))
+        order = '-' if self.descending else ''
+        lookups = self.get_lookups(names) | {self.date_field, 'id'}
+        rows = list(
+            queryset.order_by(f'{order}{self.date_field}', f'{order}id')
+            .values(*lookups)[:limit + 1]
+        )
+        next_url = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            query = request.GET.copy()
+            query['cursor'] = encode_cursor(
+                rows[-1][self.date_field], rows[-1]['id']
+            )
+            next_url = request.build_absolute_uri(
+                f'{request.path}?{query.urlencode()}'
+            )
+        return self.render({
+            'results': [self.serialize(row, names) for row in rows],
+            'next': next_url,
+        })
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get('limit', POSTS_ON_PAGE))
+        except ValueError:
+            raise ApiError('Параметр limit должен быть числом.')
+        return min(max(limit, 1), API_MAX_LIMIT)
+
+    def after(self, date, pk):
+        if self.descending:
+            return Q(**{f'{self.date_field}__lt': date}) | Q(
+                **{self.date_field: date, 'id__lt': pk}
+            )
+        return Q(**{f'{self.date_field}__gt': date}) | Q(
+            **{self.date_field: date, 'id__gt': pk}
+        )
+
+
+class PostApiMixin:
+    fields = POST_FIELDS
+    default_fields = (
+        'id',
+        'title',
+        'excerpt',
+        'pub_date',
+        'author',
+        'category',
+        'location',
+        'image',
+        'comment_count',
+    )
+
+    def get_queryset(self):
+        queryset = Post.objects.published()
+        if 'comment_count' in self.get_field_names():
+            queryset = queryset.annotate(comment_count=Count('comments'))
+        return queryset
+
+    def get_lookups(self, names):
+        lookups = super().get_lookups(names)
+        if 'location' in names:
+            lookups.add('location__is_published')
+        return lookups
+
+    def serialize(self, row, names):
+        data = super().serialize(row, names)
+        if 'location' in data and not row['location__is_published']:
+            data['location'] = None
+        if 'image' in data:
+            data['image'] = (
+                default_storage.url(data['image']) if data['image'] else None
+            )
+        return data
+
+
+class PostListApiView(PostApiMixin, ApiListView):
+    date_field = 'pub_date'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        category_slug = self.kwargs.get('category_slug')
+        if category_slug is not None:
+            category = get_published_categories().get(category_slug)
+            if category is None:
+                raise Http404
+            queryset = queryset.filter(category=category)
+        return queryset
+
+
+class PostDetailApiView(PostApiMixin, ApiView):
+    default_fields = tuple(POST_FIELDS)
+
+    def get_surrogate_keys(self):
+        return {post_key(self.kwargs['post_id'])}
+
+    def get(self, request, post_id):
+        names = self.get_field_names()
+        row = (
+            self.get_queryset()
+            .filter(pk=post_id)
+            .values(*self.get_lookups(names))
+            .first()
+        )
+        if row is None:
+            raise Http404
+        return self.render(self.serialize(row, names))
+
+
+class CommentListApiView(ApiListView):
+    fields = COMMENT_FIELDS
+    default_fields = tuple(COMMENT_FIELDS)
+    date_field = 'created_at'
+    descending = False
+
+    def get_surrogate_keys(self):
+        return {post_key(self.kwargs['post_id'])}
+
+    def get_queryset(self):
+        if not Post.objects.published().filter(
+            pk=self.kwargs['post_id']
+        ).exists():
+            raise Http404
+        return Comment.objects.filter(post=self.kwargs['post_id'])
+
+
+class CategoryListApiView(ApiView):
+
+    def get(self, request):
+        return self.render({
+            'results': [
+                {
+                    'slug': category.slug,
+                    'title': category.title,
+                    'description': category.description,
+                }
+                for category in get_published_categories().values()
+            ]
+        })
+
+
+class LocationListApiView(ApiView):
+
+    def get(self, request):
+        return self.render({
+            'results': list(
+                Location.objects.filter(is_published=True)
+                .order_by('name')
+                .values('id', 'name')
+            )
+        })
@@ -5,3 +5,10 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from blog import signals  # noqa: F401
+        from blog.cache import drop_local_categories
+        from core.bus import subscribe
+
+        subscribe('categories', drop_local_categories)
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from blog.cache import get_published_category_by_id
+from blog.models import ArchiveMonth, Post
+
+
+def month_bounds(year, month):
+    """Начало месяца и начало следующего в текущем часовом поясе."""
+    start = timezone.make_aware(datetime(year, month, 1))
+    if month == 12:
+        return start, timezone.make_aware(datetime(year + 1, 1, 1))
+    return start, timezone.make_aware(datetime(year, month + 1, 1))
+
+
+def live_month(is_published, pub_date, category_is_published):
+    """Месяц архива, в котором виден пост, или None для скрытого поста."""
+    if (
+        not is_published
+        or not category_is_published
+        or pub_date > timezone.now()
+    ):
+        return None
+    local = timezone.localtime(pub_date)
+    return local.year, local.month
+
+
+def post_month(post):
+    category = get_published_category_by_id(post.category_id)
+    return live_month(post.is_published, post.pub_date, category is not None)
+
+
+def _recount(month):
+    year, month = month
+    start, end = month_bounds(year, month)
+    ArchiveMonth.objects.update_or_create(
+        year=year,
+        month=month,
+        defaults={
+            'post_count': Post.objects.published()
+            .filter(pub_date__gte=start, pub_date__lt=end)
+            .count()
+        },
+    )
+
+
+def update_archive(previous_month, current_month):
+    """Пересчитывает месяцы архива, которых коснулось изменение поста.
+
+    Месяцы считаются заново, а не сдвигаются на единицу: отложенный пост
+    попадает в архив без сигнала, и счётчик его месяца мог не учитывать.
+    """
+    months = {previous_month, current_month} - {None}
+    with transaction.atomic():
+        for month in sorted(months):
+            _recount(month)
+
+
+def rebuild_archive():
+    """Пересчитывает месяцы архива целиком; возвращает их число.
+
+    Нужен после смены публикации категории и периодически — чтобы
+    учесть отложенные посты, время публикации которых наступило.
+    """
+    rows = (
+        Post.objects.published()
+        .annotate(month=TruncMonth('pub_date'))
+        .order_by()
+        .values('month')
+        .annotate(post_count=Count('pk'))
+    )
+    buckets = [
+        ArchiveMonth(
+            year=row['month'].year,
+            month=row['month'].month,
+            post_count=row['post_count'],
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        ArchiveMonth.objects.all().delete()
+        ArchiveMonth.objects.bulk_create(buckets)
+    return len(buckets)
@@ -0,0 +1,199 @@
+from contextlib import contextmanager
+from math import log
+from random import random
+from time import monotonic, sleep, time
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from blog.consts import (
+    CATEGORIES_CACHE_KEY,
+    CATEGORIES_CACHE_TIMEOUT,
+    CATEGORIES_LOCAL_TIMEOUT,
+    STAMPEDE_BETA,
+    STAMPEDE_LOCK_TIMEOUT,
+    STAMPEDE_STALE_TIMEOUT,
+    STAMPEDE_WAIT,
+    STAMPEDE_WAIT_STEP,
+)
+from blog.models import Category
+from core.bus import publish
+
+_local_categories = {'value': None, 'expires': 0}
+
+
+def get_published_categories():
+    """Опубликованные категории в виде словаря {slug: категория}.
+
+    Сначала смотрим в память процесса, затем в общий кэш
+    и только после этого идём в базу.
+    """
+    now = monotonic()
+    if (
+        _local_categories['value'] is not None
+        and _local_categories['expires'] > now
+    ):
+        return _local_categories['value']
+    categories = cache.get(CATEGORIES_CACHE_KEY)
+    if categories is None:
+        categories = {
+            category.slug: category
+            for category in Category.objects.filter(is_published=True)
+        }
+        cache.set(CATEGORIES_CACHE_KEY, categories, CATEGORIES_CACHE_TIMEOUT)
+    _local_categories['value'] = categories
+    _local_categories['expires'] = now + CATEGORIES_LOCAL_TIMEOUT
+    return categories
+
+
+def peek_published_categories():
+    """Категории из памяти процесса без обращения к кэшу и базе.
+
+    Возвращает None, если локальная копия отсутствует или устарела.
+    """
+    if _local_categories['expires'] > monotonic():
+        return _local_categories['value']
+    return None
+
+
+def get_published_category(slug):
+    return get_published_categories().get(slug)
+
+
+def get_published_category_by_id(category_id):
+    for category in get_published_categories().values():
+        if category.pk == category_id:
+            return category
+    return None
+
+
+def drop_local_categories(payload=None):
+    _local_categories['value'] = None
+    _local_categories['expires'] = 0
+
+
+def invalidate_categories():
+    """Сбрасывает категории в общем кэше и в памяти всех процессов."""
+    cache.delete(CATEGORIES_CACHE_KEY)
+    publish('categories')
+
+
+def get_version(name):
+    """Текущая версия группы ключей в общем кэше.
+
+    Начальное значение берётся из текущего времени, чтобы после вытеснения
+    ключа версии из кэша не вернуться к уже использованным номерам.
+    """
+    return cache.get_or_set(f'blog:version:{name}', int(time() * 1000), None)
+
+
+def get_versions(names):
+    """Версии нескольких групп одним запросом.
+
+    Отсутствующие версии задаются так же, как в get_version, и
+    перечитываются: если их одновременно задал другой воркер, у всех
+    окажется одно и то же значение.
+    """
+    keys = {f'blog:version:{name}': name for name in names}
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        initial = int(time() * 1000)
+        for key in missing:
+            cache.add(key, initial, None)
+        found.update(cache.get_many(missing))
+    return {name: found.get(key, 0) for key, name in keys.items()}
+
+
+def bump_version(name):
+    key = f'blog:version:{name}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time() * 1000), None)
+
+
+@contextmanager
+def rebuild_lock(key):
+    """Блокировка пересчёта ключа; отдаёт True, если её взял этот воркер.
+
+    Если пересчёт шёл дольше STAMPEDE_LOCK_TIMEOUT, блокировку мог взять
+    другой воркер: она снимается, только если в ней ещё свой токен.
+    """
+    lock_key = f'{key}:lock'
+    token = uuid4().hex
+    acquired = cache.add(lock_key, token, STAMPEDE_LOCK_TIMEOUT)
+    try:
+        yield acquired
+    finally:
+        if acquired and cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def wait_for(key):
+    """Ждёт, пока значение положит другой воркер; None по таймауту."""
+    deadline = monotonic() + STAMPEDE_WAIT
+    while monotonic() < deadline:
+        sleep(STAMPEDE_WAIT_STEP)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def _refresh_early(expires, duration):
+    # Чем дольше пересчёт и ближе срок, тем вероятнее обновить заранее.
+    return time() - duration * STAMPEDE_BETA * log(1 - random()) >= expires
+
+
+def _rebuild(key, rebuild, timeout, version):
+    started = time()
+    value = rebuild()
+    now = time()
+    cache.set(
+        key,
+        (value, version, now + timeout, now - started),
+        timeout + STAMPEDE_STALE_TIMEOUT,
+    )
+    return value
+
+
+def _rebuilt_meanwhile(key, entry, version):
+    """Запись, которую пересчитал другой воркер, пока ждали блокировку.
+
+    Копия в памяти процесса могла устареть, поэтому читается общий кэш.
+    """
+    get_fresh = getattr(cache, 'get_fresh', cache.get)
+    fresh = get_fresh(key)
+    if fresh is None or fresh[1] != version or fresh[2] <= time():
+        return None
+    if entry is not None and entry[1] == version and fresh[2] <= entry[2]:
+        # Это та же запись, которую решили обновить заранее.
+        return None
+    return fresh
+
+
+def get_or_rebuild(key, rebuild, timeout, version=None):
+    """Значение из кэша, которое пересчитывает только один воркер.
+
+    Устаревшее значение (истёк срок или сменилась версия) хранится ещё
+    STAMPEDE_STALE_TIMEOUT секунд: пока один воркер его пересчитывает,
+    остальные отдают старое. Незадолго до срока значение с некоторой
+    вероятностью обновляется заранее. Взяв блокировку, воркер сверяется
+    с общим кэшем: значение мог уже пересчитать другой воркер.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, entry_version, expires, duration = entry
+        if entry_version == version and not _refresh_early(expires, duration):
+            return value
+    with rebuild_lock(key) as acquired:
+        if not acquired:
+            if entry is None:
+                entry = wait_for(key)
+            if entry is not None:
+                return entry[0]
+        fresh = _rebuilt_meanwhile(key, entry, version)
+        if fresh is not None:
+            return fresh[0]
+        return _rebuild(key, rebuild, timeout, version)
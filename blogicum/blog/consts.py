@@ -1,2 +1,42 @@
 FIRST_CHARACTERS = 15
 POSTS_ON_PAGE = 10
+CATEGORIES_CACHE_KEY = 'blog:published_categories'
+CATEGORIES_CACHE_TIMEOUT = 60 * 60
+CATEGORIES_LOCAL_TIMEOUT = 30
+FEED_ITEMS = 20
+EXCERPT_WORDS = 50
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+SITEMAP_LIMIT = 50000
+SITEMAP_CHUNK_SIZE = 2000
+SITEMAP_TTL = 60 * 60
+API_MAX_LIMIT = 100
+VIEWS_FLUSH_INTERVAL = 10
+VIEWS_LOG_TIMEOUT = 60 * 60 * 24
+VIEWS_LOG_CHUNK = 1000
+TRENDING_SIZE = 100
+TRENDING_WINDOW_DAYS = 14
+TRENDING_HALF_LIFE_HOURS = 48
+TRENDING_VIEW_WEIGHT = 0.1
+RELATED_POSTS = 5
+RELATED_FEATURES = 1024
+RELATED_MAX_POSTS = 20000
+RELATED_BLOCK_SIZE = 1000
+TAG_MAX_LENGTH = 64
+TAGS_PER_POST = 10
+TAG_CLOUD_SIZE = 30
+TAG_CLOUD_LEVELS = 5
+PAGINATION_ON_EACH_SIDE = 2
+PAGINATION_ON_ENDS = 1
+POST_COUNT_CACHE_TIMEOUT = 5 * 60
+EXCERPT_BACKFILL_BATCH = 500
+POST_IDS_LIMIT = 1000
+POST_IDS_TIMEOUT = 60 * 60
+POST_CARD_TIMEOUT = 60 * 60 * 24
+STAMPEDE_LOCK_TIMEOUT = 30
+STAMPEDE_WAIT = 2
+STAMPEDE_WAIT_STEP = 0.05
+STAMPEDE_STALE_TIMEOUT = 60 * 60
+STAMPEDE_BETA = 1
+SURROGATE_KEY_HEADER = 'Surrogate-Key'
+SURROGATE_MAX_AGE = 5 * 60
+DONUT_CACHE_TIMEOUT = 60
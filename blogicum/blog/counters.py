@@ -0,0 +1,173 @@
+import logging
+import threading
+from collections import Counter, defaultdict
+from time import monotonic
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.db.models import F
+
+from blog.consts import (
+    STAMPEDE_LOCK_TIMEOUT,
+    VIEWS_FLUSH_INTERVAL,
+    VIEWS_LOG_CHUNK,
+    VIEWS_LOG_TIMEOUT,
+)
+from blog.models import Post, ViewLog
+
+logger = logging.getLogger(__name__)
+
+LOG_KEY = 'blog:views:log'
+FLUSH_LOCK_KEY = 'blog:views:flush:lock'
+
+
+def apply_deltas(deltas):
+    """Прибавляет накопленные просмотры к счётчикам постов.
+
+    Посты с одинаковым приростом обновляются одним запросом, всё
+    выполняется в одной транзакции.
+    """
+    by_delta = defaultdict(list)
+    for post_id, delta in deltas.items():
+        by_delta[delta].append(post_id)
+    with transaction.atomic():
+        for delta, post_ids in by_delta.items():
+            Post.objects.filter(pk__in=post_ids).update(
+                views=F('views') + delta
+            )
+
+
+def _entry_chunks(log, start, end):
+    """Ключи записей журнала с номерами от start до end по частям."""
+    for first in range(start, end + 1, VIEWS_LOG_CHUNK):
+        last = min(first + VIEWS_LOG_CHUNK, end + 1)
+        yield [f'blog:views:{log}:{number}' for number in range(first, last)]
+
+
+def apply_log(cache, log):
+    """Применяет новые записи журнала просмотров; возвращает число постов.
+
+    Номер записи берётся incr, а id поста пишется следующей операцией,
+    поэтому применяются записи до номера, который был последним при
+    прошлом вызове: они уже точно дописаны. Позиция журнала меняется в
+    той же транзакции, что и счётчики, и повтор после сбоя ничего
+    не удваивает.
+    """
+    last = cache.get(f'blog:views:{log}:seq', 0)
+    with transaction.atomic():
+        state, _ = ViewLog.objects.select_for_update().get_or_create(log=log)
+        start, end = state.position, state.seen
+        if start == end and last == end:
+            return 0
+        deltas = Counter()
+        for keys in _entry_chunks(log, start + 1, end):
+            deltas.update(cache.get_many(keys).values())
+        if deltas:
+            apply_deltas(deltas)
+        state.position = end
+        state.seen = last
+        state.save(update_fields=('position', 'seen'))
+    # Не удалённые из-за сбоя записи истекут сами.
+    for keys in _entry_chunks(log, start + 1, end):
+        cache.delete_many(keys)
+    return len(deltas)
+
+
+class ViewCounter:
+    """Счётчик просмотров постов с буфером в общем кэше.
+
+    Просмотр дописывается в журнал в кэше alias: номер записи берётся
+    incr, под ним кладётся id поста. В памяти процесса просмотры не
+    копятся, поэтому убитый воркер их не теряет. Раз в
+    VIEWS_FLUSH_INTERVAL секунд фоновый поток или команда flush_views
+    прибавляют новые записи к счётчикам в базе одним пакетом.
+
+    Журнал назван случайным id из того же кэша: если кэш очистили
+    и нумерация началась заново, начинается и новый журнал. Общим для
+    всех процессов журнал становится с memcached или Redis; с локальным
+    кэшем у каждого процесса свой журнал и сбрасывает его поток процесса.
+    """
+
+    def __init__(self, alias='shared', interval=VIEWS_FLUSH_INTERVAL):
+        self.alias = alias
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.flushing = False
+        self.last_flush = monotonic()
+        self.log = None
+        self.log_checked = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def current_log(self):
+        return self.cache.get_or_set(LOG_KEY, lambda: uuid4().hex, None)
+
+    def get_log(self):
+        # id журнала перечитывается не чаще раза в interval.
+        now = monotonic()
+        if self.log is None or now - self.log_checked >= self.interval:
+            self.log = self.current_log()
+            self.log_checked = now
+        return self.log
+
+    def record(self, post_id):
+        log = self.get_log()
+        seq_key = f'blog:views:{log}:seq'
+        try:
+            number = self.cache.incr(seq_key)
+        except ValueError:
+            self.cache.add(seq_key, 0, None)
+            number = self.cache.incr(seq_key)
+        self.cache.set(
+            f'blog:views:{log}:{number}', post_id, VIEWS_LOG_TIMEOUT
+        )
+        with self.lock:
+            if (
+                self.flushing
+                or monotonic() - self.last_flush < self.interval
+            ):
+                return
+            self.flushing = True
+        threading.Thread(target=self.flush_in_thread, daemon=True).start()
+
+    def flush(self):
+        """Применяет журнал к базе; возвращает число обновлённых постов.
+
+        Кроме текущего журнала сбрасывается и тот, в который процесс
+        писал до его смены.
+        """
+        self.last_flush = monotonic()
+        logs = {self.current_log(), self.log} - {None}
+        token = uuid4().hex
+        updated = 0
+        # Журнал применяет один процесс; от повторного применения
+        # защищает транзакция, блокировка лишь убирает конфликты.
+        if not self.cache.add(FLUSH_LOCK_KEY, token, STAMPEDE_LOCK_TIMEOUT):
+            self.flushing = False
+            return updated
+        try:
+            for log in logs:
+                updated += apply_log(self.cache, log)
+        except Exception:
+            logger.exception('Не удалось сохранить просмотры постов.')
+        finally:
+            if self.cache.get(FLUSH_LOCK_KEY) == token:
+                self.cache.delete(FLUSH_LOCK_KEY)
+            self.flushing = False
+        return updated
+
+    def flush_in_thread(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+
+view_counter = ViewCounter()
+
+
+def record_view(post_id):
+    view_counter.record(post_id)
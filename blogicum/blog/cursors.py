@@ -0,0 +1,29 @@
+import base64
+import binascii
+
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(date, pk):
+    """Курсор ленты: дата и id последнего показанного поста."""
+    return base64.urlsafe_b64encode(
+        f'{date.isoformat()}|{pk}'.encode()
+    ).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        date, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split(
+            '|'
+        )
+        date = parse_datetime(date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor('Некорректный курсор.')
+    if date is None:
+        raise InvalidCursor('Некорректный курсор.')
+    return date, pk
@@ -0,0 +1,346 @@
+import hashlib
+from calendar import timegm
+from collections import namedtuple
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import Min
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from blog.cache import (
+    get_published_category,
+    get_version,
+    rebuild_lock,
+    wait_for,
+)
+from blog.consts import FEED_CACHE_TIMEOUT, FEED_ITEMS
+from blog.models import Post
+from blog.purge import POSTS_KEY, set_surrogate_keys
+
+User = get_user_model()
+
+FEED_ALL = 'all'
+FEED_CATEGORY = 'category'
+FEED_AUTHOR = 'author'
+
+ITEM_FIELDS = (
+    'id',
+    'title',
+    'excerpt',
+    'pub_date',
+    'author__username',
+    'category__title',
+)
+
+FeedSource = namedtuple('FeedSource', ('title', 'link', 'snapshot'))
+
+
+def _feed_filter(kind, value):
+    if kind == FEED_CATEGORY:
+        return {'category__slug': value}
+    if kind == FEED_AUTHOR:
+        return {'author__username': value}
+    return {}
+
+
+def _snapshot_key(kind, value):
+    return f'blog:feed:{get_version("feeds")}:{kind}:{value or ""}'
+
+
+def _make_item(post_id, title, excerpt, pub_date, author, category):
+    return {
+        'id': post_id,
+        'title': title,
+        'description': excerpt,
+        'pub_date': pub_date,
+        'author': author,
+        'category': category,
+    }
+
+
+def _next_pub_date(kind, value, after):
+    """Дата ближайшей отложенной публикации в ленте."""
+    return (
+        Post.objects.filter(
+            is_published=True,
+            category__is_published=True,
+            pub_date__gt=after,
+            **_feed_filter(kind, value),
+        )
+        .aggregate(next_pub_date=Min('pub_date'))
+        .get('next_pub_date')
+    )
+
+
+def _merge(snapshot, items):
+    ids = {item['id'] for item in items}
+    merged = [item for item in snapshot['items'] if item['id'] not in ids]
+    merged.extend(items)
+    merged.sort(key=lambda item: item['pub_date'], reverse=True)
+    snapshot['items'] = merged[:FEED_ITEMS]
+
+
+def build_feed_snapshot(kind, value=None):
+    now = timezone.now()
+    rows = (
+        Post.objects.published()
+        .filter(**_feed_filter(kind, value))
+        .order_by('-pub_date')
+        .values_list(*ITEM_FIELDS)[:FEED_ITEMS]
+    )
+    return {
+        'items': [_make_item(*row) for row in rows],
+        'checked_at': now,
+        'next_pub_date': _next_pub_date(kind, value, now),
+        'updated': now,
+    }
+
+
+def get_feed_snapshot(kind, value=None):
+    """Снимок ленты из кэша.
+
+    Если с момента построения снимка подошло время отложенных публикаций,
+    в снимок догружаются только ставшие видимыми посты.
+    """
+    key = _snapshot_key(kind, value)
+    snapshot = cache.get(key)
+    now = timezone.now()
+    if snapshot is not None and not (
+        snapshot['next_pub_date'] and snapshot['next_pub_date'] <= now
+    ):
+        return snapshot
+    with rebuild_lock(key) as acquired:
+        if not acquired:
+            # Снимок обновляет другой воркер: отдаём текущий или ждём его.
+            if snapshot is None:
+                snapshot = wait_for(key)
+            if snapshot is not None:
+                return snapshot
+        if snapshot is None:
+            snapshot = build_feed_snapshot(kind, value)
+        else:
+            rows = (
+                Post.objects.published()
+                .filter(
+                    pub_date__gt=snapshot['checked_at'],
+                    **_feed_filter(kind, value),
+                )
+                .values_list(*ITEM_FIELDS)
+            )
+            _merge(snapshot, [_make_item(*row) for row in rows])
+            snapshot['checked_at'] = now
+            snapshot['next_pub_date'] = _next_pub_date(kind, value, now)
+            snapshot['updated'] = now
+        cache.set(key, snapshot, FEED_CACHE_TIMEOUT)
+    return snapshot
+
+
+def post_feeds(post):
+    feeds = {(FEED_ALL, None), (FEED_AUTHOR, post.author.username)}
+    if post.category_id is not None:
+        feeds.add((FEED_CATEGORY, post.category.slug))
+    return feeds
+
+
+def update_feed_snapshots(post, previous_feeds=(), deleted=False):
+    """Точечно обновляет закэшированные снимки лент после изменения поста.
+
+    Для удалённого поста previous_feeds — ленты, в которых он был до
+    удаления: связанные объекты к этому моменту уже не прочитать.
+    """
+    now = timezone.now()
+    if deleted:
+        current_feeds = set()
+        category = None
+    else:
+        current_feeds = post_feeds(post)
+        category = post.category if post.category_id is not None else None
+    is_live = (
+        post.is_published
+        and category is not None
+        and category.is_published
+    )
+    for kind, value in current_feeds | set(previous_feeds):
+        key = _snapshot_key(kind, value)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            continue
+        items = [
+            item for item in snapshot['items'] if item['id'] != post.pk
+        ]
+        in_feed = is_live and (kind, value) in current_feeds
+        if in_feed and post.pub_date <= now:
+            snapshot['items'] = items
+            _merge(snapshot, [_make_item(
+                post.pk,
+                post.title,
+                post.excerpt,
+                post.pub_date,
+                post.author.username,
+                category.title,
+            )])
+        elif len(items) < len(snapshot['items']) == FEED_ITEMS:
+            # Из полной ленты ушёл пост — на его место должен встать
+            # следующий по дате, поэтому снимок проще построить заново.
+            cache.delete(key)
+            continue
+        else:
+            snapshot['items'] = items
+            if in_feed and (
+                snapshot['next_pub_date'] is None
+                or post.pub_date < snapshot['next_pub_date']
+            ):
+                snapshot['next_pub_date'] = post.pub_date
+        snapshot['updated'] = now
+        cache.set(key, snapshot, FEED_CACHE_TIMEOUT)
+
+
+def stream_feed(feed, encoding):
+    """Отдаёт XML ленты по частям: заголовок, каждый элемент, окончание."""
+    buffer = StringIO()
+
+    def flush():
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    handler = SimplerXMLGenerator(buffer, encoding, short_empty_elements=True)
+    handler.startDocument()
+    if isinstance(feed, Atom1Feed):
+        item_tag = 'entry'
+        handler.startElement('feed', feed.root_attributes())
+    else:
+        item_tag = 'item'
+        handler.startElement('rss', feed.rss_attributes())
+        handler.startElement('channel', feed.root_attributes())
+    feed.add_root_elements(handler)
+    yield flush()
+    for item in feed.items:
+        handler.startElement(item_tag, feed.item_attributes(item))
+        feed.add_item_elements(handler, item)
+        handler.endElement(item_tag)
+        yield flush()
+    if isinstance(feed, Atom1Feed):
+        handler.endElement('feed')
+    else:
+        feed.endChannelElement(handler)
+        handler.endElement('rss')
+    yield flush()
+
+
+class SnapshotFeed(Feed):
+    """Лента, которая строится из закэшированного снимка.
+
+    Поддерживает условные GET-запросы и отдаёт XML потоком.
+    """
+
+    def __call__(self, request, *args, **kwargs):
+        source = self.get_object(request, *args, **kwargs)
+        updated = source.snapshot['updated']
+        last_modified = timegm(updated.utctimetuple())
+        etag = quote_etag(
+            hashlib.md5(
+                f'{request.path}:{updated.isoformat()}'.encode()
+            ).hexdigest()
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            feedgen = self.get_feed(source, request)
+            response = StreamingHttpResponse(
+                stream_feed(feedgen, settings.DEFAULT_CHARSET),
+                content_type=feedgen.content_type,
+            )
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        return set_surrogate_keys(response, {POSTS_KEY})
+
+    def title(self, source):
+        return source.title
+
+    def description(self, source):
+        return source.title
+
+    def link(self, source):
+        return source.link
+
+    def items(self, source):
+        return source.snapshot['items']
+
+    def item_title(self, item):
+        return item['title']
+
+    def item_description(self, item):
+        return item['description']
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', kwargs={'post_id': item['id']})
+
+    def item_pubdate(self, item):
+        return item['pub_date']
+
+    def item_author_name(self, item):
+        return item['author']
+
+    def item_categories(self, item):
+        return (item['category'],) if item['category'] else ()
+
+
+class PostsFeed(SnapshotFeed):
+
+    def get_object(self, request):
+        return FeedSource(
+            'Блогикум', reverse('blog:index'), get_feed_snapshot(FEED_ALL)
+        )
+
+
+class CategoryPostsFeed(SnapshotFeed):
+
+    def get_object(self, request, category_slug):
+        category = get_published_category(category_slug)
+        if category is None:
+            raise Http404
+        return FeedSource(
+            f'Блогикум: {category.title}',
+            category.get_absolute_url(),
+            get_feed_snapshot(FEED_CATEGORY, category_slug),
+        )
+
+
+class AuthorPostsFeed(SnapshotFeed):
+
+    def get_object(self, request, username):
+        snapshot = get_feed_snapshot(FEED_AUTHOR, username)
+        if (
+            not snapshot['items']
+            and not User.objects.filter(username=username).exists()
+        ):
+            raise Http404
+        return FeedSource(
+            f'Блогикум: @{username}',
+            reverse('blog:profile', kwargs={'username': username}),
+            snapshot,
+        )
+
+
+class PostsAtomFeed(PostsFeed):
+    feed_type = Atom1Feed
+
+
+class CategoryPostsAtomFeed(CategoryPostsFeed):
+    feed_type = Atom1Feed
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
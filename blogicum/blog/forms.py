@@ -1,21 +1,67 @@
 from django import forms
 
+from blog.consts import TAG_MAX_LENGTH, TAGS_PER_POST
 from blog.models import Comment, Post
+from blog.tags import get_or_create_tags, parse_tags
 
 
 class PostForm(forms.ModelForm):
+    tags = forms.CharField(
+        required=False,
+        label='Теги',
+        help_text='Несколько тегов через запятую.',
+    )
 
     class Meta:
         model = Post
         exclude = (
             'is_published',
             'author',
+            'tags',
         )
         widgets = {
             'pub_date': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
             'text': forms.Textarea(attrs={'cols': 40, 'rows': 12}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.initial['tags'] = ', '.join(
+                tag.name for tag in self.instance.tags.all()
+            )
+
+    def clean_tags(self):
+        names = parse_tags(self.cleaned_data['tags'])
+        if len(names) > TAGS_PER_POST:
+            raise forms.ValidationError(
+                f'Можно указать не больше {TAGS_PER_POST} тегов.'
+            )
+        if any(len(name) > TAG_MAX_LENGTH for name in names):
+            raise forms.ValidationError(
+                f'Тег не может быть длиннее {TAG_MAX_LENGTH} символов.'
+            )
+        return names
+
+    def save(self, commit=True):
+        post = super().save(commit=False)
+        save_m2m = self.save_m2m
+
+        def save_m2m_and_tags():
+            save_m2m()
+            post.tags.set(get_or_create_tags(self.cleaned_data['tags']))
+
+        # Теги сохраняются вместе с остальными связями, в том числе
+        # когда форму сохраняют с commit=False и вызывают save_m2m сами.
+        self.save_m2m = save_m2m_and_tags
+        if commit:
+            if post._state.adding:
+                post.save()
+            else:
+                post.save_without_views()
+            self.save_m2m()
+        return post
+
 
 class CommentForm(forms.ModelForm):
 
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import bump_version
+from blog.consts import EXCERPT_BACKFILL_BATCH
+from blog.models import Post, make_excerpt
+
+
+class Command(BaseCommand):
+    help = 'Заполняет выдержки постов пачками, не загружая таблицу целиком.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=EXCERPT_BACKFILL_BATCH
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересчитать выдержки и у постов, где они уже есть.',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(excerpt='')
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk)
+                .only('pk', 'text')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            for post in batch:
+                post.excerpt = make_excerpt(post.text)
+            Post.objects.bulk_update(batch, ['excerpt'])
+            updated += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f'Обработано постов: {updated}')
+        if updated:
+            # bulk_update не отправляет сигналы — сбрасываем снимки лент.
+            bump_version('feeds')
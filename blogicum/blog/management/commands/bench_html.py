@@ -0,0 +1,64 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.middleware import brotli, compress, minify_html
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает объём ответа и затраты процессора на минификацию '
+        'и сжатие страницы ленты при разных уровнях gzip и brotli.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='Проверяемый путь; можно указать несколько раз.',
+        )
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or [reverse('blog:index')]
+        client = Client(SERVER_NAME=settings.ALLOWED_HOSTS[0])
+        for path in paths:
+            with override_settings(HTML_MINIFY=False):
+                response = client.get(path, HTTP_ACCEPT_ENCODING='identity')
+            if response.status_code != 200:
+                raise CommandError(
+                    f'{path}: сервер вернул {response.status_code}.'
+                )
+            self.stdout.write(f'{path}:')
+            for name, size, cpu in self.measure(
+                response.content, options['iterations']
+            ):
+                self.stdout.write(
+                    f'  {name:<16} {size:>8} байт  {cpu * 1000:8.3f} мс'
+                )
+
+    def measure(self, raw, iterations):
+        html = raw.decode()
+        minified, cpu = self.timed(lambda: minify_html(html), iterations)
+        minified = minified.encode()
+        yield 'исходный', len(raw), 0
+        yield 'минификация', len(minified), cpu
+        variants = [('gzip', level) for level in (1, 6, 9)]
+        if brotli is not None:
+            variants += [('br', level) for level in (1, 5, 11)]
+        for encoding, level in variants:
+            compressed, cpu = self.timed(
+                lambda: compress(minified, encoding, level), iterations
+            )
+            yield f'{encoding} {level}', len(compressed), cpu
+
+    def timed(self, func, iterations):
+        started = time.process_time()
+        for _ in range(iterations):
+            result = func()
+        return result, (time.process_time() - started) / iterations
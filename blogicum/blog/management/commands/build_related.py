@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.related import np, rebuild_related
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает похожие публикации по TF-IDF заголовка и текста. '
+        'Требует numpy.'
+    )
+
+    def handle(self, *args, **options):
+        if np is None:
+            raise CommandError('Для расчёта нужен пакет numpy.')
+        self.stdout.write(f'Сохранено связей: {rebuild_related()}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.counters import view_counter
+
+
+class Command(BaseCommand):
+    help = (
+        'Сохраняет в базу просмотры постов из журнала в общем кэше; '
+        'записи последних секунд применяются при следующем запуске.'
+    )
+
+    def handle(self, *args, **options):
+        updated = view_counter.flush()
+        self.stdout.write(f'Обновлено счётчиков: {updated}')
@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from statistics import median
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from blog.models import Category, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест: сравнивает пропускную способность серверов, '
+        'например uvicorn (ASGI) и gunicorn/runserver (WSGI).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'targets',
+            nargs='+',
+            help='Базовые адреса серверов, например http://127.0.0.1:8000',
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='Проверяемый путь; можно указать несколько раз.',
+        )
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--timeout', type=float, default=10)
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or self.default_paths()
+        for target in options['targets']:
+            result = self.run(
+                target.rstrip('/'),
+                paths,
+                options['requests'],
+                options['concurrency'],
+                options['timeout'],
+            )
+            self.stdout.write(
+                f'{target}: {result["rps"]:.1f} запросов/с, '
+                f'p50 {result["p50"] * 1000:.1f} мс, '
+                f'p95 {result["p95"] * 1000:.1f} мс, '
+                f'ошибок: {result["errors"]}'
+            )
+
+    def default_paths(self):
+        paths = [reverse('blog:index'), reverse('pages:about')]
+        category = Category.objects.filter(is_published=True).first()
+        if category is not None:
+            paths.append(category.get_absolute_url())
+        post = Post.objects.published().first()
+        if post is not None:
+            paths.append(post.get_absolute_url())
+        return paths
+
+    def run(self, target, paths, requests, concurrency, timeout):
+        def fetch(path):
+            started = time.perf_counter()
+            try:
+                with urlopen(target + path, timeout=timeout) as response:
+                    response.read()
+                    ok = response.status < 400
+            except (HTTPError, URLError, OSError):
+                ok = False
+            return time.perf_counter() - started, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(
+                executor.map(fetch, islice(cycle(paths), requests))
+            )
+        elapsed = time.perf_counter() - started
+        latencies = sorted(latency for latency, _ in results)
+        return {
+            'rps': len(results) / elapsed,
+            'p50': median(latencies),
+            'p95': latencies[int(len(latencies) * 0.95) - 1],
+            'errors': sum(1 for _, ok in results if not ok),
+        }
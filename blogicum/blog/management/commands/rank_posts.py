@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from blog.ranking import rebuild_trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинг популярных постов; запускается '
+        'периодически, например из cron.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Постов в рейтинге: {rebuild_trending()}')
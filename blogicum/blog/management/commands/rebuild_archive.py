@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from blog.archive import rebuild_archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает число публикаций по месяцам архива; запускается '
+        'периодически, чтобы учесть отложенные публикации.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Месяцев в архиве: {rebuild_archive()}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.tags import recount_tags
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает число публикаций у тегов; запускается '
+        'периодически, чтобы учесть отложенные публикации.'
+    )
+
+    def handle(self, *args, **options):
+        recount_tags()
+        self.stdout.write('Счётчики тегов пересчитаны.')
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.16 on 2026-10-19 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_auto_20240218_1243'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='views',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name='Просмотры'
+            ),
+        ),
+    ]
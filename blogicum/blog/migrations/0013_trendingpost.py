@@ -0,0 +1,43 @@
+# Generated by Django 3.2.16 on 2026-10-19 07:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingPost',
+            fields=[
+                (
+                    'post',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='trending',
+                        serialize=False,
+                        to='blog.post',
+                        verbose_name='Публикация',
+                    ),
+                ),
+                (
+                    'score',
+                    models.FloatField(db_index=True, verbose_name='Рейтинг'),
+                ),
+                (
+                    'computed_at',
+                    models.DateTimeField(verbose_name='Дата расчёта'),
+                ),
+            ],
+            options={
+                'verbose_name': 'популярная публикация',
+                'verbose_name_plural': 'Популярные публикации',
+                'ordering': ('-score',),
+            },
+        ),
+    ]
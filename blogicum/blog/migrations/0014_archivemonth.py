@@ -0,0 +1,80 @@
+# Generated by Django 3.2.16 on 2026-10-19 07:59
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def fill_archive(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    ArchiveMonth = apps.get_model('blog', 'ArchiveMonth')
+    rows = (
+        Post.objects.filter(
+            is_published=True,
+            pub_date__lte=timezone.now(),
+            category__is_published=True,
+        )
+        .annotate(month=TruncMonth('pub_date'))
+        .order_by()
+        .values('month')
+        .annotate(post_count=Count('pk'))
+    )
+    ArchiveMonth.objects.bulk_create(
+        ArchiveMonth(
+            year=row['month'].year,
+            month=row['month'].month,
+            post_count=row['post_count'],
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_trendingpost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveMonth',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'year',
+                    models.PositiveSmallIntegerField(verbose_name='Год'),
+                ),
+                (
+                    'month',
+                    models.PositiveSmallIntegerField(verbose_name='Месяц'),
+                ),
+                (
+                    'post_count',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='Число публикаций'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'месяц архива',
+                'verbose_name_plural': 'Архив',
+                'ordering': ('-year', '-month'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='archivemonth',
+            constraint=models.UniqueConstraint(
+                fields=('year', 'month'), name='unique_archive_month'
+            ),
+        ),
+        migrations.RunPython(fill_archive, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-19 08:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_archivemonth'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'rank',
+                    models.PositiveSmallIntegerField(verbose_name='Место'),
+                ),
+                ('score', models.FloatField(verbose_name='Сходство')),
+                (
+                    'post',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='related_posts',
+                        to='blog.post',
+                        verbose_name='Публикация',
+                    ),
+                ),
+                (
+                    'related',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='related_to',
+                        to='blog.post',
+                        verbose_name='Похожая публикация',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'похожая публикация',
+                'verbose_name_plural': 'Похожие публикации',
+                'ordering': ('post', 'rank'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='relatedpost',
+            constraint=models.UniqueConstraint(
+                fields=('post', 'related'), name='unique_related_post'
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 3.2.16 on 2026-10-19 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_relatedpost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'name',
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name='Название'
+                    ),
+                ),
+                (
+                    'slug',
+                    models.SlugField(
+                        allow_unicode=True,
+                        max_length=64,
+                        unique=True,
+                        verbose_name='Идентификатор',
+                    ),
+                ),
+                (
+                    'post_count',
+                    models.PositiveIntegerField(
+                        db_index=True,
+                        default=0,
+                        editable=False,
+                        verbose_name='Число публикаций',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'тег',
+                'verbose_name_plural': 'Теги',
+                'ordering': ('name',),
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='tags',
+            field=models.ManyToManyField(
+                blank=True,
+                related_name='posts',
+                to='blog.Tag',
+                verbose_name='Теги',
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.16 on 2026-10-19 08:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(
+                blank=True, editable=False, verbose_name='Выдержка'
+            ),
+        ),
+    ]
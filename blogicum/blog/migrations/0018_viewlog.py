@@ -0,0 +1,50 @@
+# Generated by Django 3.2.16 on 2026-10-19 08:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewLog',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'log',
+                    models.CharField(
+                        max_length=32, unique=True, verbose_name='Журнал'
+                    ),
+                ),
+                (
+                    'position',
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name='Применено до записи'
+                    ),
+                ),
+                (
+                    'seen',
+                    models.PositiveBigIntegerField(
+                        default=0,
+                        verbose_name='Последняя запись при прошлом сбросе',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'журнал просмотров',
+                'verbose_name_plural': 'Журналы просмотров',
+            },
+        ),
+    ]
@@ -1,27 +1,137 @@
-from django.db.models import Count
+import hashlib
+from functools import partial
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
-from django.utils import timezone
 
-from blog.consts import POSTS_ON_PAGE
+from blog.consts import DONUT_CACHE_TIMEOUT, POSTS_ON_PAGE
 from blog.forms import CommentForm, PostForm
 from blog.models import Comment, Post
+from blog.paginators import CountPaginator, get_count_strategy
+from blog.post_cache import CachedPostList, get_post_ids
+from blog.purge import (
+    POSTS_KEY,
+    key_versions,
+    post_keys,
+    set_surrogate_keys,
+)
+from core.donut import fill_holes
+
+
+class SurrogateKeyMixin:
+    """Помечает ответ ключами данных, от которых зависит страница."""
+
+    def get_surrogate_keys(self, context):
+        return set()
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        self.surrogate_keys = self.get_surrogate_keys(context)
+        return set_surrogate_keys(response, self.surrogate_keys)
+
+
+class DonutCacheMixin:
+    """Кэширует страницу одну на всех, кроме персональных фрагментов.
+
+    Фрагменты из тега {% hole %} (шапка с именем пользователя и т. п.)
+    рендерятся для каждого запроса, поэтому страница из кэша подходит
+    и гостям, и авторизованным пользователям. Страница устаревает, как
+    только меняется версия любого из её суррогатных ключей. Содержимое
+    самой страницы не должно зависеть от пользователя.
+
+    В ключ кэша попадают только параметры из donut_params: остальные
+    параметры запроса страницу не меняют и не плодят копии в кэше.
+    """
+
+    donut_timeout = DONUT_CACHE_TIMEOUT
+    donut_params = ('page', 'cursor')
 
+    def get_donut_key(self):
+        query = urlencode(sorted(
+            (name, value)
+            for name in self.donut_params
+            for value in self.request.GET.getlist(name)
+        ))
+        path = f'{self.request.path}?{query}' if query else self.request.path
+        return f'blog:donut:{hashlib.md5(path.encode()).hexdigest()}'
 
-class ListMixin:
+    def get(self, request, *args, **kwargs):
+        key = self.get_donut_key()
+        page = cache.get(key)
+        if page is not None and key_versions(page['keys']) == page['versions']:
+            response = HttpResponse(
+                fill_holes(page['content'], request),
+                content_type=page['content_type'],
+            )
+            return set_surrogate_keys(response, page['keys'])
+        response = super().get(request, *args, **kwargs)
+        response.context_data['donut'] = True
+        response.add_post_render_callback(partial(self.store_page, key))
+        return response
+
+    def store_page(self, key, response):
+        if response.status_code == 200:
+            cache.set(
+                key,
+                {
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                    'keys': self.surrogate_keys,
+                    'versions': key_versions(self.surrogate_keys),
+                },
+                self.donut_timeout,
+            )
+        response.content = fill_holes(response.content, self.request)
+
+
+class ListMixin(SurrogateKeyMixin):
     model = Post
     paginate_by = POSTS_ON_PAGE
+    count_key = None
 
     def get_queryset(self):
-        return (
-            Post.objects.select_related('author', 'location', 'category')
-            .order_by('-pub_date')
-            .annotate(comment_count=Count('comments'))
-            .filter(
-                is_published=True,
-                pub_date__lte=timezone.now(),
-                category__is_published=True,
+        return Post.objects.for_cards().order_by('-pub_date').published()
+
+    def get_count_key(self):
+        """Ключ кэша числа постов в ленте; None — считать каждый раз."""
+        return self.count_key
+
+    def estimate_count(self):
+        return None
+
+    def get_surrogate_keys(self, context):
+        keys = {POSTS_KEY}
+        for post in context['object_list']:
+            keys |= post_keys(post)
+        return keys
+
+    def get_list_filters(self):
+        """Условия ленты для кэша списка id; None — лента не кэшируется."""
+        return None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        strategy = get_count_strategy()
+        filters = self.get_list_filters()
+        key = self.get_count_key()
+        if filters is None or key is None:
+            return CountPaginator(
+                queryset,
+                per_page,
+                count_func=lambda: strategy(self, queryset),
+                **kwargs,
             )
+        ids, truncated = get_post_ids(key, filters)
+        return CountPaginator(
+            CachedPostList(ids, queryset),
+            per_page,
+            count_func=(
+                (lambda: strategy(self, queryset)) if truncated
+                else (lambda: len(ids))
+            ),
+            **kwargs,
         )
 
 
@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Count
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import Truncator
 
-from blog.consts import FIRST_CHARACTERS
+from blog.consts import EXCERPT_WORDS, FIRST_CHARACTERS, TAG_MAX_LENGTH
 from core.models import BaseModel
 
 User = get_user_model()
@@ -44,9 +47,79 @@ class Location(BaseModel):
         return self.name[:FIRST_CHARACTERS]
 
 
+def make_excerpt(text):
+    return Truncator(text).words(EXCERPT_WORDS)
+
+
+class Tag(models.Model):
+    name = models.CharField(
+        max_length=TAG_MAX_LENGTH, unique=True, verbose_name='Название'
+    )
+    slug = models.SlugField(
+        max_length=TAG_MAX_LENGTH,
+        unique=True,
+        allow_unicode=True,
+        verbose_name='Идентификатор',
+    )
+    post_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        verbose_name='Число публикаций',
+    )
+
+    class Meta:
+        verbose_name = 'тег'
+        verbose_name_plural = 'Теги'
+        ordering = ('name',)
+
+    def __str__(self):
+        return self.name[:FIRST_CHARACTERS]
+
+    def get_absolute_url(self):
+        return reverse('blog:tag_posts', kwargs={'tag_slug': self.slug})
+
+
+class PostQuerySet(models.QuerySet):
+
+    def published(self):
+        return self.filter(
+            is_published=True,
+            pub_date__lte=timezone.now(),
+            category__is_published=True,
+        )
+
+    def for_cards(self):
+        """Только поля, которые выводит карточка поста в ленте.
+
+        Вместо полного текста берётся сохранённая выдержка, а у автора —
+        только имя пользователя.
+        """
+        return (
+            self.select_related('author', 'location', 'category')
+            .only(
+                'title',
+                'excerpt',
+                'pub_date',
+                'image',
+                'is_published',
+                'author__username',
+                'location__name',
+                'location__is_published',
+                'category__title',
+                'category__slug',
+                'category__is_published',
+            )
+            .annotate(comment_count=Count('comments'))
+        )
+
+
 class Post(BaseModel):
     title = models.CharField(max_length=256, verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
+    excerpt = models.TextField(
+        blank=True, editable=False, verbose_name='Выдержка'
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text=(
@@ -75,6 +148,12 @@ class Post(BaseModel):
     image = models.ImageField(
         blank=True, upload_to='post_images', verbose_name='Изображение'
     )
+    views = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Просмотры'
+    )
+    tags = models.ManyToManyField(Tag, blank=True, verbose_name='Теги')
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
@@ -88,6 +167,27 @@ class Post(BaseModel):
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'post_id': self.pk})
 
+    def save(self, *args, **kwargs):
+        self.excerpt = make_excerpt(self.text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
+    def save_without_views(self):
+        """Сохраняет изменения поста, не трогая счётчик просмотров.
+
+        Счётчик меняется только F()-обновлениями, и его значение
+        в загруженном экземпляре может быть устаревшим.
+        """
+        deferred = self.get_deferred_fields()
+        self.save(update_fields=[
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.name != 'views'
+            and field.attname not in deferred
+        ])
+
 
 class Comment(models.Model):
     text = models.TextField(verbose_name='Текст')
@@ -113,3 +213,99 @@ class Comment(models.Model):
 
     def __str__(self):
         return self.text[:FIRST_CHARACTERS]
+
+
+class ViewLog(models.Model):
+    """До какой записи журнал просмотров в кэше применён к счётчикам."""
+
+    log = models.CharField(max_length=32, unique=True, verbose_name='Журнал')
+    position = models.PositiveBigIntegerField(
+        default=0, verbose_name='Применено до записи'
+    )
+    seen = models.PositiveBigIntegerField(
+        default=0, verbose_name='Последняя запись при прошлом сбросе'
+    )
+
+    class Meta:
+        verbose_name = 'журнал просмотров'
+        verbose_name_plural = 'Журналы просмотров'
+
+    def __str__(self):
+        return f'{self.log}: {self.position}'
+
+
+class TrendingPost(models.Model):
+    post = models.OneToOneField(
+        Post,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='trending',
+        verbose_name='Публикация',
+    )
+    score = models.FloatField(db_index=True, verbose_name='Рейтинг')
+    computed_at = models.DateTimeField(verbose_name='Дата расчёта')
+
+    class Meta:
+        verbose_name = 'популярная публикация'
+        verbose_name_plural = 'Популярные публикации'
+        ordering = ('-score',)
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score:.2f}'
+
+
+class ArchiveMonth(models.Model):
+    year = models.PositiveSmallIntegerField(verbose_name='Год')
+    month = models.PositiveSmallIntegerField(verbose_name='Месяц')
+    post_count = models.PositiveIntegerField(
+        default=0, verbose_name='Число публикаций'
+    )
+
+    class Meta:
+        verbose_name = 'месяц архива'
+        verbose_name_plural = 'Архив'
+        ordering = ('-year', '-month')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('year', 'month'), name='unique_archive_month'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.month:02}.{self.year}: {self.post_count}'
+
+    def get_absolute_url(self):
+        return reverse(
+            'blog:archive_month',
+            kwargs={'year': self.year, 'month': self.month},
+        )
+
+
+class RelatedPost(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_posts',
+        verbose_name='Публикация',
+    )
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_to',
+        verbose_name='Похожая публикация',
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name='Место')
+    score = models.FloatField(verbose_name='Сходство')
+
+    class Meta:
+        verbose_name = 'похожая публикация'
+        verbose_name_plural = 'Похожие публикации'
+        ordering = ('post', 'rank')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('post', 'related'), name='unique_related_post'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.post_id} → {self.related_id}'
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from blog.cache import get_or_rebuild, get_version
+from blog.consts import POST_COUNT_CACHE_TIMEOUT
+
+
+class CountPaginator(Paginator):
+    """Пагинатор, который получает число объектов от стратегии подсчёта."""
+
+    def __init__(self, object_list, per_page, count_func=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_func = count_func
+
+    @cached_property
+    def count(self):
+        if self.count_func is None:
+            return super().count
+        return self.count_func()
+
+
+def exact_count(view, queryset):
+    return queryset.count()
+
+
+def cached_count(view, queryset):
+    """Точное число, закэшированное до следующего изменения постов."""
+    key = view.get_count_key()
+    if key is None:
+        return queryset.count()
+    return get_or_rebuild(
+        f'blog:count:{key}',
+        queryset.count,
+        POST_COUNT_CACHE_TIMEOUT,
+        get_version('post_lists'),
+    )
+
+
+def estimated_count(view, queryset):
+    """Оценка по поддерживаемым счётчикам, если представление её даёт."""
+    estimate = view.estimate_count()
+    if estimate is None:
+        return cached_count(view, queryset)
+    return estimate
+
+
+COUNT_STRATEGIES = {
+    'exact': exact_count,
+    'cached': cached_count,
+    'estimated': estimated_count,
+}
+
+
+def get_count_strategy():
+    return COUNT_STRATEGIES[settings.POST_COUNT_STRATEGY]
@@ -0,0 +1,157 @@
+from time import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.fields.files import FieldFile
+
+from blog.cache import get_or_rebuild, get_version
+from blog.consts import POST_CARD_TIMEOUT, POST_IDS_LIMIT, POST_IDS_TIMEOUT
+from blog.models import Category, Location, Post
+
+User = get_user_model()
+
+
+def _card_fields(model, names):
+    # from_db ожидает значения в порядке полей модели.
+    return tuple(
+        field.attname for field in model._meta.concrete_fields
+        if field.attname in names
+    )
+
+
+POST_CARD_FIELDS = _card_fields(
+    Post,
+    {
+        'id',
+        'title',
+        'excerpt',
+        'pub_date',
+        'image',
+        'is_published',
+        'author_id',
+        'location_id',
+        'category_id',
+    },
+)
+USER_CARD_FIELDS = _card_fields(User, {'id', 'username'})
+CATEGORY_CARD_FIELDS = _card_fields(
+    Category, {'id', 'title', 'slug', 'is_published'}
+)
+LOCATION_CARD_FIELDS = _card_fields(Location, {'id', 'name', 'is_published'})
+
+
+def _card_key(post_id):
+    return f'blog:card:{get_version("post_cards")}:{post_id}'
+
+
+def get_post_ids(key, filters):
+    """Id постов ленты по убыванию даты и признак, что список обрезан.
+
+    В кэше лежат и отложенные посты вместе с датой публикации: они
+    отсеиваются при чтении, поэтому список не надо сбрасывать, когда
+    наступает время публикации.
+    """
+    rows = get_or_rebuild(
+        f'blog:ids:{key}',
+        lambda: [
+            (pk, pub_date.timestamp())
+            for pk, pub_date in Post.objects.filter(
+                is_published=True, category__is_published=True, **filters
+            )
+            .order_by('-pub_date', '-pk')
+            .values_list('pk', 'pub_date')[:POST_IDS_LIMIT]
+        ],
+        POST_IDS_TIMEOUT,
+        get_version('post_lists'),
+    )
+    now = time()
+    return (
+        [pk for pk, timestamp in rows if timestamp <= now],
+        len(rows) >= POST_IDS_LIMIT,
+    )
+
+
+def _value(instance, field):
+    value = getattr(instance, field)
+    # В кэш кладётся имя файла, а не объект FieldFile.
+    return value.name if isinstance(value, FieldFile) else value
+
+
+def _values(instance, fields):
+    if instance is None:
+        return None
+    return tuple(_value(instance, field) for field in fields)
+
+
+def _from_values(model, fields, values):
+    if values is None:
+        return None
+    return model.from_db(DEFAULT_DB_ALIAS, fields, values)
+
+
+def make_card(post):
+    """Компактный кортеж с данными карточки вместо модели целиком."""
+    return (
+        _values(post, POST_CARD_FIELDS),
+        _values(post.author, USER_CARD_FIELDS),
+        _values(post.category, CATEGORY_CARD_FIELDS),
+        _values(post.location, LOCATION_CARD_FIELDS),
+        post.comment_count,
+    )
+
+
+def post_from_card(card):
+    post_values, author, category, location, comment_count = card
+    post = _from_values(Post, POST_CARD_FIELDS, post_values)
+    post.author = _from_values(User, USER_CARD_FIELDS, author)
+    post.category = _from_values(Category, CATEGORY_CARD_FIELDS, category)
+    post.location = _from_values(Location, LOCATION_CARD_FIELDS, location)
+    post.comment_count = comment_count
+    return post
+
+
+def get_posts(ids):
+    """Посты для карточек в порядке ids: из кэша и одним запросом к базе.
+
+    Пока список id пересчитывается, в нём могут остаться только что
+    скрытые посты: из базы берутся только опубликованные.
+    """
+    keys = {_card_key(pk): pk for pk in ids}
+    cards = {
+        keys[key]: card for key, card in cache.get_many(keys).items()
+    }
+    missing = [pk for pk in ids if pk not in cards]
+    if missing:
+        fetched = {
+            post.pk: make_card(post)
+            for post in Post.objects.for_cards()
+            .published()
+            .filter(pk__in=missing)
+        }
+        cache.set_many(
+            {_card_key(pk): card for pk, card in fetched.items()},
+            POST_CARD_TIMEOUT,
+        )
+        cards.update(fetched)
+    return [post_from_card(cards[pk]) for pk in ids if pk in cards]
+
+
+def invalidate_post_card(post_id):
+    cache.delete(_card_key(post_id))
+
+
+class CachedPostList:
+    """Лента для пагинатора: первые страницы берутся из кэша.
+
+    Страницы дальше закэшированного списка id читаются из queryset.
+    """
+
+    def __init__(self, ids, queryset):
+        self.ids = ids
+        self.queryset = queryset
+
+    def __getitem__(self, index):
+        if index.stop is not None and index.stop <= len(self.ids):
+            return get_posts(self.ids[index])
+        return list(self.queryset[index])
@@ -0,0 +1,178 @@
+import atexit
+import logging
+from threading import Event, Lock, Thread
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.utils.module_loading import import_string
+
+from blog.cache import (
+    bump_version,
+    get_published_category_by_id,
+    get_versions,
+)
+from blog.consts import SURROGATE_KEY_HEADER, SURROGATE_MAX_AGE
+from blog.models import Post
+
+logger = logging.getLogger(__name__)
+
+# Ключ всех лент: меняется при любом изменении публикаций.
+POSTS_KEY = 'posts'
+SITEMAPS_KEY = 'sitemaps'
+
+
+def post_key(post_id):
+    return f'post-{post_id}'
+
+
+def category_key(slug):
+    return f'category-{slug}'
+
+
+def author_key(author_id):
+    return f'author-{author_id}'
+
+
+def location_key(location_id):
+    return f'location-{location_id}'
+
+
+def post_keys(post):
+    """Ключи данных, которые выводятся в карточке или на странице поста."""
+    keys = {post_key(post.pk), author_key(post.author_id)}
+    if post.category_id is not None:
+        category = (
+            post.category if Post.category.is_cached(post)
+            else get_published_category_by_id(post.category_id)
+        )
+        if category is not None:
+            keys.add(category_key(category.slug))
+    if post.location_id is not None:
+        keys.add(location_key(post.location_id))
+    return keys
+
+
+def key_versions(keys):
+    """Версии ключей для проверки страниц в кэше приложения."""
+    versions = get_versions(f'surrogate:{key}' for key in keys)
+    return {name.split(':', 1)[1]: value for name, value in versions.items()}
+
+
+def set_surrogate_keys(response, keys):
+    """Ставит ключи и срок хранения страницы в кэше прокси.
+
+    Срок ограничивает устаревание, если очистка не дошла или её нет:
+    отложенный пост появляется без сигнала и ничего не очищает.
+    """
+    response[SURROGATE_KEY_HEADER] = ' '.join(sorted(keys))
+    patch_cache_control(response, s_maxage=SURROGATE_MAX_AGE)
+    return response
+
+
+class Purger:
+    """Очистка кэша обратного прокси или CDN по суррогатным ключам."""
+
+    def purge(self, keys):
+        raise NotImplementedError
+
+
+class NullPurger(Purger):
+    """Для работы без прокси: ключи никуда не отправляются."""
+
+    def purge(self, keys):
+        pass
+
+
+class HttpPurger(Purger):
+    """Отправляет ключи POST-запросом, как принято у Fastly и Varnish."""
+
+    def __init__(self, url, header=SURROGATE_KEY_HEADER, timeout=2):
+        self.url = url
+        self.header = header
+        self.timeout = timeout
+
+    def purge(self, keys):
+        request = Request(
+            self.url,
+            method='POST',
+            headers={self.header: ' '.join(sorted(keys))},
+        )
+        try:
+            urlopen(request, timeout=self.timeout).close()
+        except (URLError, OSError):
+            logger.exception('Не удалось очистить ключи %s', sorted(keys))
+
+
+def get_purger():
+    config = settings.SURROGATE_PURGER
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+class PurgeQueue:
+    """Ключи на очистку, которые отправляет фоновый поток.
+
+    Медленный или недоступный прокси не задерживает запросы: ключи
+    нескольких сохранений копятся и уходят одним запросом.
+    """
+
+    def __init__(self):
+        self.keys = set()
+        self.lock = Lock()
+        self.sending = Lock()
+        self.wakeup = Event()
+        self.thread = None
+
+    def put(self, keys):
+        with self.lock:
+            self.keys |= keys
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = Thread(target=self.send_forever, daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+
+    def flush(self):
+        """Отправляет накопленные ключи и ждёт уже начатую отправку."""
+        with self.sending:
+            with self.lock:
+                keys, self.keys = self.keys, set()
+            if keys:
+                get_purger().purge(keys)
+
+    def send_forever(self):
+        while True:
+            self.wakeup.wait()
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Не удалось отправить ключи на очистку')
+
+
+purge_queue = PurgeQueue()
+atexit.register(purge_queue.flush)
+
+
+def _bump_keys(keys):
+    for key in keys:
+        bump_version(f'surrogate:{key}')
+
+
+def _purge_committed(keys):
+    _bump_keys(keys)
+    purge_queue.put(keys)
+
+
+def purge(*keys):
+    """Сбрасывает страницы с этими ключами.
+
+    Версии ключей меняются сразу и ещё раз после фиксации транзакции:
+    страница, отрендеренная до фиксации по старым данным, могла попасть
+    в кэш уже с новыми версиями. Прокси получает запрос на очистку тоже
+    после фиксации.
+    """
+    keys = set(keys)
+    _bump_keys(keys)
+    transaction.on_commit(lambda: _purge_committed(keys))
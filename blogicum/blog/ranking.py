@@ -0,0 +1,61 @@
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+from operator import itemgetter
+
+from django.db import transaction
+from django.utils import timezone
+
+from blog.consts import (
+    TRENDING_HALF_LIFE_HOURS,
+    TRENDING_SIZE,
+    TRENDING_VIEW_WEIGHT,
+    TRENDING_WINDOW_DAYS,
+)
+from blog.models import Comment, Post, TrendingPost
+
+
+def decay(moment, now):
+    """Вес события: половина за каждые TRENDING_HALF_LIFE_HOURS часов."""
+    hours = max((now - moment).total_seconds() / 3600, 0)
+    return 0.5 ** (hours / TRENDING_HALF_LIFE_HOURS)
+
+
+def compute_scores(now):
+    """Рейтинг свежих постов по комментариям и просмотрам.
+
+    Каждый комментарий даёт вес, убывающий с его возрастом; просмотры
+    учитываются с весом TRENDING_VIEW_WEIGHT и затуханием по дате поста.
+    """
+    posts = Post.objects.published().filter(
+        pub_date__gte=now - timedelta(days=TRENDING_WINDOW_DAYS)
+    )
+    scores = defaultdict(float)
+    for post_id, pub_date, views in posts.values_list(
+        'pk', 'pub_date', 'views'
+    ).iterator():
+        if views:
+            scores[post_id] += TRENDING_VIEW_WEIGHT * views * decay(
+                pub_date, now
+            )
+    comments = Comment.objects.filter(post__in=posts).values_list(
+        'post_id', 'created_at'
+    )
+    for post_id, created_at in comments.iterator():
+        scores[post_id] += decay(created_at, now)
+    return scores
+
+
+def rebuild_trending(now=None):
+    """Пересчитывает таблицу популярных постов, возвращает её размер."""
+    now = now or timezone.now()
+    top = heapq.nlargest(
+        TRENDING_SIZE, compute_scores(now).items(), key=itemgetter(1)
+    )
+    with transaction.atomic():
+        TrendingPost.objects.all().delete()
+        TrendingPost.objects.bulk_create(
+            TrendingPost(post_id=post_id, score=score, computed_at=now)
+            for post_id, score in top
+        )
+    return len(top)
@@ -0,0 +1,95 @@
+import re
+import zlib
+
+from django.db import transaction
+
+from blog.consts import (
+    RELATED_BLOCK_SIZE,
+    RELATED_FEATURES,
+    RELATED_MAX_POSTS,
+    RELATED_POSTS,
+)
+from blog.models import Post, RelatedPost
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WORD_RE = re.compile(r'\w{3,}')
+
+
+def _feature(word):
+    # crc32 стабилен между запусками, в отличие от встроенного hash().
+    return zlib.crc32(word.encode()) % RELATED_FEATURES
+
+
+def build_matrix(texts):
+    """Нормированная TF-IDF матрица текстов.
+
+    Слова хешируются в RELATED_FEATURES столбцов, поэтому размер
+    матрицы не зависит от словаря.
+    """
+    matrix = np.zeros((len(texts), RELATED_FEATURES), dtype=np.float32)
+    for row, text in enumerate(texts):
+        features = [_feature(word) for word in WORD_RE.findall(text.lower())]
+        if features:
+            np.add.at(matrix[row], features, 1)
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+    matrix = np.log1p(matrix) * idf.astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def nearest(matrix, k):
+    """Индексы и сходство k ближайших соседей для каждой строки.
+
+    Сходство считается блоками строк, чтобы не держать в памяти
+    всю квадратную матрицу.
+    """
+    k = min(k, len(matrix) - 1)
+    for start in range(0, len(matrix), RELATED_BLOCK_SIZE):
+        similarity = matrix[start:start + RELATED_BLOCK_SIZE] @ matrix.T
+        rows = np.arange(len(similarity))
+        similarity[rows, rows + start] = -1
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        yield (
+            np.take_along_axis(top, order, axis=1),
+            np.take_along_axis(top_scores, order, axis=1),
+        )
+
+
+def rebuild_related(k=RELATED_POSTS):
+    """Пересчитывает похожие публикации; возвращает число связей."""
+    rows = list(
+        Post.objects.published()
+        .order_by('-pub_date')
+        .values_list('pk', 'title', 'text')[:RELATED_MAX_POSTS]
+    )
+    links = []
+    if len(rows) > 1:
+        matrix = build_matrix([f'{title} {text}' for _, title, text in rows])
+        row = 0
+        for indexes, scores in nearest(matrix, k):
+            for neighbours, neighbour_scores in zip(indexes, scores):
+                links.extend(
+                    RelatedPost(
+                        post_id=rows[row][0],
+                        related_id=rows[index][0],
+                        rank=rank,
+                        score=float(score),
+                    )
+                    for rank, (index, score) in enumerate(
+                        zip(neighbours, neighbour_scores)
+                    )
+                    if score > 0
+                )
+                row += 1
+    with transaction.atomic():
+        RelatedPost.objects.all().delete()
+        RelatedPost.objects.bulk_create(links, batch_size=1000)
+    return len(links)
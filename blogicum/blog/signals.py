@@ -0,0 +1,171 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from blog.archive import (
+    live_month,
+    post_month,
+    rebuild_archive,
+    update_archive,
+)
+from blog.cache import bump_version, invalidate_categories
+from blog.feeds import (
+    FEED_AUTHOR,
+    FEED_CATEGORY,
+    post_feeds,
+    update_feed_snapshots,
+)
+from blog.models import Category, Comment, Location, Post
+from blog.post_cache import invalidate_post_card
+from blog.purge import (
+    POSTS_KEY,
+    author_key,
+    category_key,
+    location_key,
+    post_key,
+    purge,
+)
+from blog.sitemaps import invalidate_sitemaps
+from blog.tags import recount_tags
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=Category)
+def remember_previous_category(instance, **kwargs):
+    if instance.pk is None:
+        instance._previous_slug = None
+        return
+    instance._previous_slug = (
+        Category.objects.filter(pk=instance.pk)
+        .values_list('slug', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(instance, **kwargs):
+    slugs = {instance.slug, getattr(instance, '_previous_slug', None)}
+    purge(POSTS_KEY, *(category_key(slug) for slug in slugs if slug))
+    invalidate_categories()
+    bump_version('feeds')
+    invalidate_sitemaps()
+    bump_version('post_lists')
+    bump_version('post_cards')
+    rebuild_archive()
+    recount_tags()
+
+
+@receiver(post_save, sender=User)
+def user_changed(instance, update_fields=None, **kwargs):
+    if update_fields is None or 'username' in update_fields:
+        purge(author_key(instance.pk))
+        bump_version('feeds')
+        bump_version('post_cards')
+        invalidate_sitemaps()
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def location_changed(instance, **kwargs):
+    purge(location_key(instance.pk))
+    bump_version('post_cards')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(instance, **kwargs):
+    purge(post_key(instance.post_id))
+    invalidate_post_card(instance.post_id)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_post(instance, **kwargs):
+    instance._previous_feeds = set()
+    instance._previous_month = None
+    if instance.pk is None:
+        return
+    previous = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list(
+            'category__slug',
+            'author__username',
+            'is_published',
+            'pub_date',
+            'category__is_published',
+        )
+        .first()
+    )
+    if previous is not None:
+        category_slug, username, *visibility = previous
+        instance._previous_month = live_month(*visibility)
+        instance._previous_feeds.add((FEED_AUTHOR, username))
+        if category_slug is not None:
+            instance._previous_feeds.add((FEED_CATEGORY, category_slug))
+
+
+@receiver(post_save, sender=Post)
+def post_saved(instance, created, **kwargs):
+    purge(POSTS_KEY, post_key(instance.pk))
+    update_feed_snapshots(
+        instance, getattr(instance, '_previous_feeds', ())
+    )
+    invalidate_sitemaps()
+    bump_version('post_lists')
+    invalidate_post_card(instance.pk)
+    previous_month = getattr(instance, '_previous_month', None)
+    current_month = post_month(instance)
+    update_archive(previous_month, current_month)
+    if not created and (previous_month is None) != (current_month is None):
+        recount_tags(set(instance.tags.values_list('pk', flat=True)))
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(instance, **kwargs):
+    instance._tag_ids = set(instance.tags.values_list('pk', flat=True))
+    # После удаления автор или категория могут уже не читаться из базы.
+    try:
+        instance._previous_feeds = post_feeds(instance)
+    except ObjectDoesNotExist:
+        instance._previous_feeds = None
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(instance, **kwargs):
+    purge(POSTS_KEY, post_key(instance.pk))
+    invalidate_sitemaps()
+    bump_version('post_lists')
+    invalidate_post_card(instance.pk)
+    update_archive(post_month(instance), None)
+    recount_tags(getattr(instance, '_tag_ids', set()))
+    previous_feeds = getattr(instance, '_previous_feeds', None)
+    if previous_feeds is None:
+        bump_version('feeds')
+    else:
+        update_feed_snapshots(instance, previous_feeds, deleted=True)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed(instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        post_ids = (pk_set or ()) if reverse else {instance.pk}
+        purge(POSTS_KEY, *(post_key(post_id) for post_id in post_ids))
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            recount_tags({instance.pk})
+    elif action == 'pre_clear':
+        instance._cleared_tag_ids = set(
+            instance.tags.values_list('pk', flat=True)
+        )
+    elif action == 'post_clear':
+        recount_tags(instance._cleared_tag_ids)
+    elif action in ('post_add', 'post_remove'):
+        recount_tags(pk_set)
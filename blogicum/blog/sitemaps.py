@@ -0,0 +1,198 @@
+import os
+import shutil
+import tempfile
+from math import ceil
+from time import time
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Max, Min
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.cache import bump_version, get_version
+from blog.consts import SITEMAP_CHUNK_SIZE, SITEMAP_LIMIT, SITEMAP_TTL
+from blog.models import Category, Post
+from blog.purge import SITEMAPS_KEY, purge, set_surrogate_keys
+
+User = get_user_model()
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+EXPIRES_KEY = 'blog:sitemaps:expires'
+
+
+class PostSitemap:
+    name = 'posts'
+
+    def queryset(self):
+        return (
+            Post.objects.published()
+            .order_by('pk')
+            .values_list('pk', 'pub_date')
+        )
+
+    def location(self, row):
+        return reverse('blog:post_detail', kwargs={'post_id': row[0]})
+
+
+class CategorySitemap:
+    name = 'categories'
+
+    def queryset(self):
+        return (
+            Category.objects.filter(is_published=True)
+            .order_by('pk')
+            .values_list('slug', 'created_at')
+        )
+
+    def location(self, row):
+        return reverse('blog:category_posts', kwargs={'category_slug': row[0]})
+
+
+class ProfileSitemap:
+    name = 'profiles'
+
+    def queryset(self):
+        return (
+            User.objects.filter(
+                posts__is_published=True,
+                posts__pub_date__lte=timezone.now(),
+                posts__category__is_published=True,
+            )
+            .annotate(lastmod=Max('posts__pub_date'))
+            .order_by('pk')
+            .values_list('username', 'lastmod')
+        )
+
+    def location(self, row):
+        return reverse('blog:profile', kwargs={'username': row[0]})
+
+
+SITEMAPS = {
+    sitemap.name: sitemap
+    for sitemap in (PostSitemap(), CategorySitemap(), ProfileSitemap())
+}
+
+
+def _expires():
+    """Срок файлов: SITEMAP_TTL или время публикации ближайшего поста.
+
+    Отложенный пост появляется на сайте без сигнала, поэтому файлы,
+    собранные до его публикации, должны к этому моменту устареть.
+    """
+    expires = time() + SITEMAP_TTL
+    next_pub_date = Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+        pub_date__gt=timezone.now(),
+    ).aggregate(Min('pub_date'))['pub_date__min']
+    if next_pub_date is not None:
+        expires = min(expires, next_pub_date.timestamp())
+    return expires
+
+
+def _sitemap_dir(request):
+    expires = cache.get(EXPIRES_KEY)
+    if expires is None or expires <= time():
+        invalidate_sitemaps()
+        cache.set(EXPIRES_KEY, _expires(), None)
+    return (
+        settings.SITEMAP_ROOT
+        / str(get_version('sitemaps'))
+        / request.get_host().replace(':', '_')
+    )
+
+
+def _write_atomic(path, lines):
+    """Пишет файл построчно во временный файл и подменяет им целевой."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
+            tmp_file.writelines(lines)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _url_lines(request, sitemap, page):
+    base = f'{request.scheme}://{request.get_host()}'
+    yield XML_HEADER
+    yield f'<urlset xmlns="{XMLNS}">\n'
+    rows = sitemap.queryset()[(page - 1) * SITEMAP_LIMIT:page * SITEMAP_LIMIT]
+    for row in rows.iterator(chunk_size=SITEMAP_CHUNK_SIZE):
+        location = escape(base + sitemap.location(row))
+        yield f'<url><loc>{location}</loc>'
+        if row[-1] is not None:
+            yield f'<lastmod>{row[-1].date().isoformat()}</lastmod>'
+        yield '</url>\n'
+    yield '</urlset>\n'
+
+
+def _index_lines(request):
+    yield XML_HEADER
+    yield f'<sitemapindex xmlns="{XMLNS}">\n'
+    for name, sitemap in SITEMAPS.items():
+        pages = max(ceil(sitemap.queryset().count() / SITEMAP_LIMIT), 1)
+        for page in range(1, pages + 1):
+            location = escape(request.build_absolute_uri(reverse(
+                'blog:sitemap_section',
+                kwargs={'section': name, 'page': page},
+            )))
+            yield f'<sitemap><loc>{location}</loc></sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def _open(path, build_lines):
+    try:
+        return FileResponse(open(path, 'rb'), content_type='application/xml')
+    except FileNotFoundError:
+        pass
+    try:
+        _write_atomic(path, build_lines())
+        return FileResponse(open(path, 'rb'), content_type='application/xml')
+    except FileNotFoundError:
+        # Каталог версии удалила инвалидация: отдаём карту без диска.
+        return HttpResponse(
+            ''.join(build_lines()), content_type='application/xml'
+        )
+
+
+def _serve(path, build_lines):
+    return set_surrogate_keys(_open(path, build_lines), {SITEMAPS_KEY})
+
+
+def sitemap_index(request):
+    path = _sitemap_dir(request) / 'sitemap.xml'
+    return _serve(path, lambda: _index_lines(request))
+
+
+def sitemap_section(request, section, page):
+    sitemap = SITEMAPS.get(section)
+    if sitemap is None or page < 1:
+        raise Http404
+    path = _sitemap_dir(request) / f'{section}-{page}.xml'
+    if not path.exists() and page > 1 and not sitemap.queryset()[
+        (page - 1) * SITEMAP_LIMIT:
+    ].exists():
+        raise Http404
+    return _serve(path, lambda: _url_lines(request, sitemap, page))
+
+
+def invalidate_sitemaps():
+    """Переключает версию карт сайта и удаляет файлы старых версий."""
+    bump_version('sitemaps')
+    purge(SITEMAPS_KEY)
+    # Новый срок считает первый запрос к новой версии.
+    cache.delete(EXPIRES_KEY)
+    current = str(get_version('sitemaps'))
+    if not settings.SITEMAP_ROOT.exists():
+        return
+    for path in settings.SITEMAP_ROOT.iterdir():
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
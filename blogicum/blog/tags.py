@@ -0,0 +1,51 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.text import slugify
+
+from blog.models import Post, Tag
+
+
+def parse_tags(value):
+    """Уникальные названия тегов из строки через запятую."""
+    names = []
+    for name in value.split(','):
+        name = ' '.join(name.split()).lower()
+        if name and slugify(name, allow_unicode=True) and name not in names:
+            names.append(name)
+    return names
+
+
+def get_or_create_tags(names):
+    tags = []
+    for name in names:
+        tag, _ = Tag.objects.get_or_create(
+            slug=slugify(name, allow_unicode=True), defaults={'name': name}
+        )
+        tags.append(tag)
+    return tags
+
+
+def recount_tags(tag_ids=None):
+    """Пересчитывает число опубликованных постов у тегов одним UPDATE.
+
+    Без аргумента пересчитываются все теги — это нужно после смены
+    публикации категории и периодически для отложенных постов.
+    """
+    published = (
+        Post.objects.published()
+        .filter(tags=OuterRef('pk'))
+        .order_by()
+        .values('tags')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    tags = Tag.objects.all()
+    if tag_ids is not None:
+        if not tag_ids:
+            return
+        tags = tags.filter(pk__in=tag_ids)
+    tags.update(
+        post_count=Coalesce(
+            Subquery(published, output_field=IntegerField()), 0
+        )
+    )
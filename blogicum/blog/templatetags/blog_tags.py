@@ -0,0 +1,65 @@
+from django import template
+
+from blog.cache import get_published_category_by_id
+from blog.consts import (
+    PAGINATION_ON_EACH_SIDE,
+    PAGINATION_ON_ENDS,
+    TAG_CLOUD_LEVELS,
+    TAG_CLOUD_SIZE,
+)
+from blog.models import ArchiveMonth, Post, Tag
+
+register = template.Library()
+
+
+@register.filter
+def post_category(post):
+    """Категория поста без лишнего запроса к базе.
+
+    Если категория уже загружена через select_related — берём её,
+    иначе ищем среди закэшированных опубликованных категорий.
+    """
+    if Post.category.is_cached(post):
+        return post.category
+    return get_published_category_by_id(post.category_id) or post.category
+
+
+@register.simple_tag
+def elided_page_range(page_obj):
+    """Номера страниц вокруг текущей и по краям, с многоточиями между ними.
+
+    Число ссылок не зависит от общего числа страниц.
+    """
+    return page_obj.paginator.get_elided_page_range(
+        page_obj.number,
+        on_each_side=PAGINATION_ON_EACH_SIDE,
+        on_ends=PAGINATION_ON_ENDS,
+    )
+
+
+@register.inclusion_tag('includes/archive_sidebar.html')
+def archive_sidebar():
+    """Месяцы архива с числом публикаций из заранее посчитанной таблицы."""
+    return {
+        'months': ArchiveMonth.objects.filter(
+            post_count__gt=0
+        ).order_by('-year', '-month'),
+    }
+
+
+@register.inclusion_tag('includes/tag_cloud.html')
+def tag_cloud():
+    """Самые популярные теги по сохранённому числу публикаций."""
+    tags = list(
+        Tag.objects.filter(post_count__gt=0)
+        .order_by('-post_count')[:TAG_CLOUD_SIZE]
+    )
+    if tags:
+        top = tags[0].post_count
+        for tag in tags:
+            # Класс bootstrap fs-1 — самый крупный шрифт.
+            tag.size = (
+                TAG_CLOUD_LEVELS
+                - (TAG_CLOUD_LEVELS - 1) * tag.post_count // top
+            )
+    return {'tags': sorted(tags, key=lambda tag: tag.name)}
@@ -1,6 +1,6 @@
 from django.urls import include, path
 
-from blog import views
+from blog import api, feeds, sitemaps, views
 
 app_name = 'blog'
 
@@ -49,15 +49,93 @@ profile_urls = [
         views.UserPostListView.as_view(),
         name='profile',
     ),
+    path(
+        '<slug:username>/feed/',
+        feeds.AuthorPostsFeed(),
+        name='profile_feed',
+    ),
+    path(
+        '<slug:username>/feed/atom/',
+        feeds.AuthorPostsAtomFeed(),
+        name='profile_feed_atom',
+    ),
+]
+
+api_urls = [
+    path('posts/', api.PostListApiView.as_view(), name='api_posts'),
+    path(
+        'posts/<int:post_id>/',
+        api.PostDetailApiView.as_view(),
+        name='api_post_detail',
+    ),
+    path(
+        'posts/<int:post_id>/comments/',
+        api.CommentListApiView.as_view(),
+        name='api_comments',
+    ),
+    path(
+        'categories/',
+        api.CategoryListApiView.as_view(),
+        name='api_categories',
+    ),
+    path(
+        'categories/<slug:category_slug>/posts/',
+        api.PostListApiView.as_view(),
+        name='api_category_posts',
+    ),
+    path(
+        'locations/',
+        api.LocationListApiView.as_view(),
+        name='api_locations',
+    ),
 ]
 
 urlpatterns = [
     path('posts/', include(posts_urls)),
+    path('api/', include(api_urls)),
     path("profile/", include(profile_urls)),
     path(
         'category/<slug:category_slug>/',
         views.CategoryPostListView.as_view(),
         name='category_posts',
     ),
+    path(
+        'category/<slug:category_slug>/feed/',
+        feeds.CategoryPostsFeed(),
+        name='category_feed',
+    ),
+    path(
+        'category/<slug:category_slug>/feed/atom/',
+        feeds.CategoryPostsAtomFeed(),
+        name='category_feed_atom',
+    ),
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap_index'),
+    path(
+        'sitemaps/<slug:section>/<int:page>.xml',
+        sitemaps.sitemap_section,
+        name='sitemap_section',
+    ),
+    path(
+        'archive/<int:year>/',
+        views.ArchivePostListView.as_view(),
+        name='archive_year',
+    ),
+    path(
+        'archive/<int:year>/<int:month>/',
+        views.ArchivePostListView.as_view(),
+        name='archive_month',
+    ),
+    path(
+        'tags/<str:tag_slug>/',
+        views.TagPostListView.as_view(),
+        name='tag_posts',
+    ),
+    path(
+        'trending/',
+        views.TrendingPostListView.as_view(),
+        name='trending',
+    ),
+    path('feed/', feeds.PostsFeed(), name='feed'),
+    path('feed/atom/', feeds.PostsAtomFeed(), name='feed_atom'),
     path('', views.PostListView.as_view(), name='index'),
 ]
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Q
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
@@ -12,37 +14,177 @@ from django.views.generic import (
     UpdateView,
 )
 
+from blog.archive import month_bounds
+from blog.cache import get_published_category, peek_published_categories
+from blog.consts import POSTS_ON_PAGE
+from blog.counters import record_view
+from blog.cursors import InvalidCursor, decode_cursor, encode_cursor
 from blog.forms import CommentForm
-from blog.mixins import CommentMixin, ListMixin, PostEditMixin, PostFormMixin
-from blog.models import Category, Comment, Post
+from blog.mixins import (
+    CommentMixin,
+    DonutCacheMixin,
+    ListMixin,
+    PostEditMixin,
+    PostFormMixin,
+    SurrogateKeyMixin,
+)
+from blog.models import ArchiveMonth, Comment, Post, Tag
+from blog.purge import author_key, category_key, post_key, post_keys
+from core.mixins import AsyncViewMixin
 
 User = get_user_model()
 
 
-class PostListView(ListMixin, ListView):
+class PostListView(
+    AsyncViewMixin, DonutCacheMixin, ListMixin, ListView
+):
     template_name = 'blog/index.html'
+    count_key = 'index'
 
+    def get_list_filters(self):
+        return {}
+
+    def estimate_count(self):
+        return ArchiveMonth.objects.aggregate(
+            count=Coalesce(Sum('post_count'), 0)
+        )['count']
 
-class CategoryPostListView(ListMixin, ListView):
-    template_name = 'blog/category.html'
+
+class TrendingPostListView(
+    AsyncViewMixin, DonutCacheMixin, ListMixin, ListView
+):
+    template_name = 'blog/trending.html'
 
     def get_queryset(self):
         return (
-            super()
-            .get_queryset()
-            .filter(
-                category__slug=self.kwargs.get('category_slug'),
-            )
+            super().get_queryset()
+            .filter(trending__isnull=False)
+            .order_by('-trending__score', '-pub_date')
+        )
+
+
+class ArchivePostListView(
+    AsyncViewMixin, DonutCacheMixin, ListMixin, ListView
+):
+    template_name = 'blog/archive.html'
+
+    def get(self, request, *args, **kwargs):
+        year = self.kwargs['year']
+        month = self.kwargs.get('month')
+        if not 1 <= year < 9999 or month not in (None, *range(1, 13)):
+            raise Http404
+        if month is None:
+            self.start = month_bounds(year, 1)[0]
+            self.end = month_bounds(year, 12)[1]
+        else:
+            self.start, self.end = month_bounds(year, month)
+        return super().get(request, *args, **kwargs)
+
+    def get_list_filters(self):
+        return {'pub_date__gte': self.start, 'pub_date__lt': self.end}
+
+    def get_count_key(self):
+        return f'archive:{self.kwargs["year"]}:{self.kwargs.get("month")}'
+
+    def estimate_count(self):
+        buckets = ArchiveMonth.objects.filter(year=self.kwargs['year'])
+        if self.kwargs.get('month') is not None:
+            buckets = buckets.filter(month=self.kwargs['month'])
+        return buckets.aggregate(
+            count=Coalesce(Sum('post_count'), 0)
+        )['count']
+
+    def get_queryset(self):
+        return super().get_queryset().filter(
+            pub_date__gte=self.start, pub_date__lt=self.end
         )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category.objects.filter(
-                is_published=True,
-                slug=self.kwargs.get('category_slug'),
+        context['archive_date'] = self.start
+        context['archive_month'] = self.kwargs.get('month')
+        return context
+
+
+class TagPostListView(
+    AsyncViewMixin, DonutCacheMixin, ListMixin, ListView
+):
+    """Публикации с тегом, постранично по курсору (дата, id)."""
+
+    template_name = 'blog/tag.html'
+    paginate_by = None
+
+    def get(self, request, *args, **kwargs):
+        self.tag = get_object_or_404(Tag, slug=self.kwargs['tag_slug'])
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = (
+            super().get_queryset()
+            .filter(tags=self.tag)
+            .order_by('-pub_date', '-pk')
+        )
+        cursor = self.request.GET.get('cursor')
+        if cursor:
+            try:
+                pub_date, pk = decode_cursor(cursor)
+            except InvalidCursor:
+                raise Http404
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
             )
+        return queryset[:POSTS_ON_PAGE + 1]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        posts = list(context['object_list'])
+        context['tag'] = self.tag
+        context['posts'] = posts[:POSTS_ON_PAGE]
+        if len(posts) > POSTS_ON_PAGE:
+            last = posts[POSTS_ON_PAGE - 1]
+            context['next_cursor'] = encode_cursor(last.pub_date, last.pk)
+        return context
+
+
+class CategoryPostListView(
+    AsyncViewMixin, DonutCacheMixin, ListMixin, ListView
+):
+    template_name = 'blog/category.html'
+
+    @classmethod
+    async def async_precheck(cls, request, *args, **kwargs):
+        categories = peek_published_categories()
+        if (
+            categories is not None
+            and kwargs.get('category_slug') not in categories
+        ):
+            raise Http404
+
+    def get(self, request, *args, **kwargs):
+        self.category = get_published_category(
+            self.kwargs.get('category_slug')
         )
+        if self.category is None:
+            raise Http404
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return super().get_queryset().filter(category=self.category)
+
+    def get_count_key(self):
+        return f'category:{self.category.pk}'
+
+    def get_list_filters(self):
+        return {'category': self.category}
+
+    def get_surrogate_keys(self, context):
+        return super().get_surrogate_keys(context) | {
+            category_key(self.category.slug)
+        }
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['category'] = self.category
         return context
 
 
@@ -57,12 +199,25 @@ class UserPostListView(ListMixin, ListView):
             return super().get_queryset().filter(author=self.author)
         else:
             return (
-                Post.objects.select_related('author', 'location', 'category')
+                Post.objects.for_cards()
                 .order_by('-pub_date')
-                .annotate(comment_count=Count('comments'))
                 .filter(author=self.author)
             )
 
+    def get_list_filters(self):
+        if self.author == self.request.user:
+            return None
+        return {'author': self.author}
+
+    def get_count_key(self):
+        own = self.author == self.request.user
+        return f'author:{self.author.pk}:{"all" if own else "published"}'
+
+    def get_surrogate_keys(self, context):
+        return super().get_surrogate_keys(context) | {
+            author_key(self.author.pk)
+        }
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['profile'] = self.author
@@ -83,7 +238,7 @@ class UserUpdateView(LoginRequiredMixin, UpdateView):
         return self.request.user
 
 
-class PostDetailView(DetailView):
+class PostDetailView(AsyncViewMixin, SurrogateKeyMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
@@ -101,14 +256,34 @@ class PostDetailView(DetailView):
             )
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        post = super().get_object(queryset)
+        record_view(post.pk)
+        return post
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
         context['comments'] = Comment.objects.select_related('author').filter(
             post=self.kwargs.get('post_id')
         )
+        context['tags'] = self.object.tags.all()
+        context['related_posts'] = (
+            Post.objects.published()
+            .filter(related_to__post=self.object)
+            .order_by('related_to__rank')
+            .only('id', 'title')
+        )
         return context
 
+    def get_surrogate_keys(self, context):
+        keys = post_keys(self.object)
+        keys.update(
+            author_key(comment.author_id) for comment in context['comments']
+        )
+        keys.update(post_key(post.pk) for post in context['related_posts'])
+        return keys
+
 
 class PostCreateView(LoginRequiredMixin, PostFormMixin, CreateView):
     model = Post
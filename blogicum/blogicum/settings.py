@@ -53,13 +53,16 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.InvalidationBusMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.HtmlMinifyMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
 INTERNAL_IPS = [
@@ -88,6 +91,23 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
+
+# Панель отладки работает только синхронно: под ASGI она перевела бы
+# в поток всю цепочку middleware.
+if not ASYNC_VIEWS:
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
+# Подсчёт числа постов для пагинации: exact, cached или estimated.
+POST_COUNT_STRATEGY = 'cached'
+
+HTML_MINIFY = True
+
+COMPRESSION_LEVELS = {
+    'gzip': 6,
+    'br': 5,
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
@@ -99,6 +119,43 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.TieredCache',
+        'LOCATION': 'blogicum',
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_TIMEOUT': 5,
+            'SYNC_INTERVAL': 0.5,
+            'MAX_ENTRIES': 1000,
+            'MAX_BYTES': 16 * 1024 * 1024,
+        },
+    },
+    'shared': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+INVALIDATION_BUS = {
+    'BACKEND': 'core.bus.SQLiteBus',
+    'OPTIONS': {
+        'path': BASE_DIR / 'invalidation.sqlite3',
+        'poll_interval': 0.2,
+    },
+}
+
+# Очистка кэша прокси по заголовку Surrogate-Key, например
+# PURGE_URL=http://127.0.0.1:6081/purge для Varnish.
+SURROGATE_PURGER = {'BACKEND': 'blog.purge.NullPurger'}
+if os.getenv('PURGE_URL'):
+    SURROGATE_PURGER = {
+        'BACKEND': 'blog.purge.HttpPurger',
+        'OPTIONS': {'url': os.getenv('PURGE_URL')},
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -142,6 +199,10 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static_dev',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -155,6 +216,10 @@ LOGIN_URL = 'login'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+SITEMAP_ROOT = BASE_DIR / 'sitemaps'
+
+PRERENDER_ROOT = BASE_DIR / 'prerendered'
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
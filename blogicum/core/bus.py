@@ -0,0 +1,262 @@
+import atexit
+import json
+import logging
+import os
+import sqlite3
+from collections import defaultdict
+from threading import Event, Lock, Thread, local
+from time import monotonic, sleep, time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_bus = None
+_bus_lock = Lock()
+_subscriptions = []
+
+
+class InvalidationBus:
+    """Шина событий инвалидации между процессами.
+
+    Обработчики подписываются на тему в каждом процессе. publish сразу
+    вызывает обработчики своего процесса, а транспорту события
+    передаются пачками из фонового потока, чтобы запрос не ждал записи.
+    poll доставляет события других процессов. Транспорт задают
+    подклассы методами send и receive.
+    """
+
+    def __init__(self, poll_interval=0.2, send_delay=0.05):
+        self.poll_interval = poll_interval
+        self.send_delay = send_delay
+        self.polled_at = 0
+        self.handlers = defaultdict(list)
+        self.lock = Lock()
+        self.pending = []
+        self.pending_lock = Lock()
+        self.wakeup = Event()
+        self.sender = None
+        self.pid = None
+        self._origin = None
+
+    @property
+    def origin(self):
+        # Процессы, созданные fork после создания шины, должны получить
+        # свой id, иначе они примут события друг друга за свои.
+        pid = os.getpid()
+        if self.pid != pid:
+            self.pid = pid
+            self._origin = uuid4().hex
+        return self._origin
+
+    def subscribe(self, topic, handler):
+        self.handlers[topic].append(handler)
+
+    def publish(self, topic, payload=None):
+        self.dispatch(topic, payload)
+        with self.pending_lock:
+            self.pending.append((topic, payload))
+            if self.sender is None or not self.sender.is_alive():
+                self.sender = Thread(target=self.send_forever, daemon=True)
+                self.sender.start()
+        self.wakeup.set()
+
+    def flush(self):
+        """Отправляет накопленные события одной пачкой."""
+        with self.pending_lock:
+            events, self.pending = self.pending, []
+        if events:
+            self.send(events)
+
+    def send_forever(self):
+        while True:
+            self.wakeup.wait()
+            # Небольшая задержка собирает события соседних запросов.
+            sleep(self.send_delay)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Не удалось отправить события шины.')
+
+    def is_due(self):
+        """Пора ли забрать события: с прошлого раза прошёл poll_interval."""
+        return monotonic() - self.polled_at >= self.poll_interval
+
+    def poll(self, force=False):
+        if not force and not self.is_due():
+            return
+        now = monotonic()
+        if not self.lock.acquire(blocking=False):
+            # События уже забирает другой поток процесса.
+            return
+        try:
+            self.polled_at = now
+            for topic, payload in self.receive():
+                self.dispatch(topic, payload)
+        finally:
+            self.lock.release()
+
+    def dispatch(self, topic, payload):
+        for handler in self.handlers[topic]:
+            handler(payload)
+
+    def send(self, events):
+        """Передаёт транспорту список пар (тема, данные)."""
+        raise NotImplementedError
+
+    def receive(self):
+        """События других процессов, пришедшие после прошлого вызова."""
+        raise NotImplementedError
+
+
+class SQLiteBus(InvalidationBus):
+    """Шина в файле SQLite: для процессов одной машины и тестов."""
+
+    def __init__(self, path, retention=60 * 60, prune_every=100, **kwargs):
+        super().__init__(**kwargs)
+        self.path = str(path)
+        self.retention = retention
+        self.prune_every = prune_every
+        self.sent = 0
+        self.local = local()
+        with self.connection as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS events ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'origin TEXT, topic TEXT, payload TEXT, created REAL)'
+            )
+            self.last_id = connection.execute(
+                'SELECT COALESCE(MAX(id), 0) FROM events'
+            ).fetchone()[0]
+
+    @property
+    def connection(self):
+        # Соединение SQLite нельзя передавать между потоками.
+        if not hasattr(self.local, 'connection'):
+            connection = sqlite3.connect(self.path, timeout=5)
+            # События теряют смысл через секунды, fsync на каждое не нужен.
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+        return self.local.connection
+
+    def send(self, events):
+        now = time()
+        with self.connection as connection:
+            connection.executemany(
+                'INSERT INTO events (origin, topic, payload, created) '
+                'VALUES (?, ?, ?, ?)',
+                [
+                    (self.origin, topic, json.dumps(payload), now)
+                    for topic, payload in events
+                ],
+            )
+            self.sent += 1
+            if self.sent % self.prune_every == 0:
+                connection.execute(
+                    'DELETE FROM events WHERE created < ?',
+                    (now - self.retention,),
+                )
+
+    def receive(self):
+        with self.connection as connection:
+            rows = connection.execute(
+                'SELECT id, origin, topic, payload FROM events '
+                'WHERE id > ? ORDER BY id',
+                (self.last_id,),
+            ).fetchall()
+        for event_id, origin, topic, payload in rows:
+            self.last_id = event_id
+            if origin != self.origin:
+                yield topic, json.loads(payload)
+
+
+class CacheBus(InvalidationBus):
+    """Шина через общий кэш (memcached, Redis) для нескольких машин.
+
+    События лежат под последовательными номерами, номер последнего
+    хранится в отдельном ключе. Вытесненные из кэша события теряются,
+    поэтому обработчики не должны полагаться на полную доставку:
+    устаревание копий всё равно ограничено их сроком жизни.
+    """
+
+    def __init__(self, alias='shared', retention=60 * 60, **kwargs):
+        super().__init__(**kwargs)
+        self.alias = alias
+        self.retention = retention
+        self.last_id = self.cache.get(self._last_key(), 0)
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _last_key(self):
+        return 'bus:last'
+
+    def _event_key(self, event_id):
+        return f'bus:event:{event_id}'
+
+    def send(self, events):
+        self.cache.add(self._last_key(), 0, None)
+        last_id = self.cache.incr(self._last_key(), len(events))
+        first_id = last_id - len(events) + 1
+        self.cache.set_many(
+            {
+                self._event_key(event_id): (self.origin, topic, payload)
+                for event_id, (topic, payload) in enumerate(events, first_id)
+            },
+            self.retention,
+        )
+
+    def receive(self):
+        last_id = self.cache.get(self._last_key(), 0)
+        if last_id < self.last_id:
+            # Счётчик пропал из кэша и начался заново.
+            self.last_id = 0
+        if last_id == self.last_id:
+            return
+        keys = [
+            self._event_key(event_id)
+            for event_id in range(self.last_id + 1, last_id + 1)
+        ]
+        events = self.cache.get_many(keys)
+        self.last_id = last_id
+        for key in keys:
+            if key not in events:
+                continue
+            origin, topic, payload = events[key]
+            if origin != self.origin:
+                yield topic, payload
+
+
+def get_bus():
+    """Шина процесса, собранная по настройке INVALIDATION_BUS."""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                config = settings.INVALIDATION_BUS
+                bus = import_string(config['BACKEND'])(
+                    **config.get('OPTIONS', {})
+                )
+                for topic, handler in _subscriptions:
+                    bus.subscribe(topic, handler)
+                # Неотправленные события уходят при завершении процесса.
+                atexit.register(bus.flush)
+                _bus = bus
+    return _bus
+
+
+def subscribe(topic, handler):
+    """Подписка для шины процесса; саму шину создаёт первое обращение."""
+    _subscriptions.append((topic, handler))
+    if _bus is not None:
+        _bus.subscribe(topic, handler)
+
+
+def publish(topic, payload=None):
+    get_bus().publish(topic, payload)
@@ -0,0 +1,323 @@
+import pickle
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic, time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from core.bus import publish, subscribe
+
+_MISSING = object()
+_tiers = {}
+_tiers_lock = Lock()
+
+
+class LocalTier:
+    """LRU-кэш процесса с ограничением по числу записей и объёму.
+
+    Значения хранятся в pickle: так известен их размер, а изменение
+    полученного объекта не портит закэшированную копию.
+    """
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.generations = {}
+        self.synced_at = 0
+        self.counters = dict.fromkeys(
+            ('local_hits', 'shared_hits', 'misses', 'evictions'), 0
+        )
+        self.lock = Lock()
+
+    def get(self, key, generation):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            data, expires, entry_generation = entry
+            if expires <= monotonic() or entry_generation != generation:
+                self._pop(key)
+                return None
+            self.entries.move_to_end(key)
+            return data
+
+    def set(self, key, data, timeout, generation):
+        with self.lock:
+            self._pop(key)
+            if timeout <= 0 or len(data) > self.max_bytes:
+                return
+            self.entries[key] = (data, monotonic() + timeout, generation)
+            self.size += len(data)
+            while (
+                len(self.entries) > self.max_entries
+                or self.size > self.max_bytes
+            ):
+                self.size -= len(self.entries.popitem(last=False)[1][0])
+                self.counters['evictions'] += 1
+
+    def delete(self, key):
+        with self.lock:
+            self._pop(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.generations.clear()
+
+    def count(self, counter, number=1):
+        with self.lock:
+            self.counters[counter] += number
+
+    def _pop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+
+def forget_local(keys):
+    """Удаляет копии ключей из памяти процесса во всех кэшах."""
+    for tier in list(_tiers.values()):
+        for key in keys:
+            tier.delete(key)
+
+
+class TieredCache(BaseCache):
+    """Двухуровневый кэш: LRU в памяти процесса перед общим кэшем.
+
+    Запись значения копии других процессов не сбрасывает: заполнение
+    кэша — частая операция, а перезаписанный ключ они перечитают не
+    позже чем через LOCAL_TIMEOUT секунд. Удаление и incr/decr — явная
+    инвалидация: ключ рассылается через шину, а версия его группы
+    (первые две части имени: blog:card, blog:version и т. п.)
+    увеличивается на случай, если событие шины потеряется. Процесс
+    сверяет версии своих групп не чаще раза в SYNC_INTERVAL секунд.
+    Блокировки и другие ключи с суффиксами из SHARED_ONLY_SUFFIXES
+    в память процесса не попадают.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED', 'shared')
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self.sync_interval = options.get('SYNC_INTERVAL', 0.5)
+        self.shared_only = tuple(
+            options.get('SHARED_ONLY_SUFFIXES', (':lock',))
+        )
+        with _tiers_lock:
+            self.tier = _tiers.setdefault(
+                name,
+                LocalTier(
+                    options.get('MAX_ENTRIES', 1000),
+                    options.get('MAX_BYTES', 16 * 1024 * 1024),
+                ),
+            )
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def stats(self):
+        """Попадания по уровням и их доля среди всех чтений процесса."""
+        with self.tier.lock:
+            stats = dict(self.tier.counters)
+            stats['entries'] = len(self.tier.entries)
+            stats['bytes'] = self.tier.size
+        reads = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        for tier in ('local', 'shared'):
+            stats[f'{tier}_hit_rate'] = (
+                stats[f'{tier}_hits'] / reads if reads else 0
+            )
+        return stats
+
+    def _is_local(self, key):
+        return not key.endswith(self.shared_only)
+
+    def _group(self, key):
+        return ':'.join(key.split(':', 2)[:2])
+
+    def _generation_key(self, group):
+        return f'tiered:generation:{group}'
+
+    def _generation(self, group):
+        self._sync()
+        generations = self.tier.generations
+        if group not in generations:
+            generations[group] = self.shared.get(
+                self._generation_key(group), 0
+            )
+        return generations[group]
+
+    def _sync(self):
+        tier = self.tier
+        now = monotonic()
+        if now - tier.synced_at < self.sync_interval:
+            return
+        tier.synced_at = now
+        if not tier.generations:
+            return
+        keys = {
+            self._generation_key(group): group
+            for group in list(tier.generations)
+        }
+        values = self.shared.get_many(keys)
+        for key, group in keys.items():
+            tier.generations[group] = values.get(key, 0)
+
+    def _bump(self, group):
+        key = self._generation_key(group)
+        try:
+            generation = self.shared.incr(key)
+        except ValueError:
+            # Начинаем с текущего времени, чтобы после вытеснения ключа
+            # версии не совпасть со старыми записями других процессов.
+            generation = int(time() * 1000)
+            self.shared.set(key, generation, None)
+        self.tier.generations[group] = generation
+        return generation
+
+    def _local_timeout(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return self.local_timeout
+        return min(self.local_timeout, timeout - time())
+
+    def _store(self, key, value, version, timeout, generation):
+        self.tier.set(
+            self.make_key(key, version),
+            pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+            timeout,
+            generation,
+        )
+
+    def _filled(self, data, version, timeout):
+        """Кладёт записанные значения в память процесса."""
+        local_timeout = self._local_timeout(timeout)
+        for key, value in data.items():
+            if self._is_local(key):
+                generation = self._generation(self._group(key))
+                self._store(key, value, version, local_timeout, generation)
+
+    def _invalidated(self, keys, version):
+        """Сбрасывает копии ключей во всех процессах."""
+        keys = [key for key in keys if self._is_local(key)]
+        if not keys:
+            return
+        for group in {self._group(key) for key in keys}:
+            self._bump(group)
+        publish('cache', [self.make_key(key, version) for key in keys])
+
+    def get(self, key, default=None, version=None):
+        if not self._is_local(key):
+            return self.shared.get(key, default, version)
+        generation = self._generation(self._group(key))
+        data = self.tier.get(self.make_key(key, version), generation)
+        if data is not None:
+            self.tier.count('local_hits')
+            return pickle.loads(data)
+        value = self.shared.get(key, _MISSING, version)
+        if value is _MISSING:
+            self.tier.count('misses')
+            return default
+        self.tier.count('shared_hits')
+        self._store(key, value, version, self.local_timeout, generation)
+        return value
+
+    def get_fresh(self, key, default=None, version=None):
+        """Значение из общего кэша в обход копии процесса.
+
+        Копия в памяти процесса заменяется прочитанным значением.
+        """
+        value = self.shared.get(key, _MISSING, version)
+        if not self._is_local(key):
+            return default if value is _MISSING else value
+        if value is _MISSING:
+            self.tier.delete(self.make_key(key, version))
+            return default
+        generation = self._generation(self._group(key))
+        self._store(key, value, version, self.local_timeout, generation)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        generations = {}
+        rest = []
+        for key in keys:
+            if not self._is_local(key):
+                rest.append(key)
+                continue
+            generation = self._generation(self._group(key))
+            generations[key] = generation
+            data = self.tier.get(self.make_key(key, version), generation)
+            if data is None:
+                rest.append(key)
+            else:
+                found[key] = pickle.loads(data)
+        self.tier.count('local_hits', len(found))
+        shared = self.shared.get_many(rest, version) if rest else {}
+        self.tier.count('shared_hits', len(shared))
+        self.tier.count('misses', len(rest) - len(shared))
+        for key, value in shared.items():
+            if key in generations:
+                self._store(
+                    key, value, version, self.local_timeout, generations[key]
+                )
+        found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version)
+        self._filled({key: value}, version, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version)
+        self._filled(
+            {
+                key: value for key, value in data.items()
+                if key not in failed
+            },
+            version,
+            timeout,
+        )
+        for key in failed:
+            self.tier.delete(self.make_key(key, version))
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version)
+        if added:
+            self._filled({key: value}, version, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version)
+        self._invalidated([key], version)
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        value = self.shared.decr(key, delta, version)
+        self._invalidated([key], version)
+        return value
+
+    def delete(self, key, version=None):
+        deleted = self.shared.delete(key, version)
+        self._invalidated([key], version)
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        self.shared.delete_many(keys, version)
+        self._invalidated(keys, version)
+
+    def clear(self):
+        self.shared.clear()
+        self.tier.clear()
+
+
+subscribe('cache', forget_local)
@@ -0,0 +1,168 @@
+"""Сборка урезанного CSS: удаление неиспользуемых правил и critical CSS."""
+
+import re
+
+CLASS_ATTR_RE = re.compile(r'class=(["\'])(.*?)\1', re.S)
+TEMPLATE_TAG_RE = re.compile(r'{%.*?%}|{{.*?}}', re.S)
+SELECTOR_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+# Классы внутри :not() не обязаны быть на странице.
+NOT_PSEUDO_RE = re.compile(r':not\([^()]*\)')
+GROUPING_AT_RULES = ('@media', '@supports')
+NON_CRITICAL_PSEUDO_RE = re.compile(
+    r':(hover|focus|focus-visible|focus-within|active|visited|disabled)'
+)
+
+# Классы, которые django-bootstrap5 добавляет при выводе форм и кнопок,
+# и классы размера шрифта облака тегов, которые подставляются в шаблоне.
+SAFELIST = {
+    'alert',
+    'alert-danger',
+    'alert-dismissible',
+    'btn',
+    'btn-close',
+    'btn-primary',
+    'col-form-label',
+    'fade',
+    'form-check',
+    'form-check-input',
+    'form-check-label',
+    'form-control',
+    'form-label',
+    'form-select',
+    'form-text',
+    'fs-1',
+    'fs-2',
+    'fs-3',
+    'fs-4',
+    'fs-5',
+    'input-group',
+    'input-group-text',
+    'invalid-feedback',
+    'is-invalid',
+    'is-valid',
+    'mb-3',
+    'show',
+    'visually-hidden',
+}
+
+
+def template_classes(paths):
+    """Классы, которые встречаются в атрибутах class шаблонов."""
+    classes = set()
+    for path in paths:
+        source = path.read_text(encoding='utf-8')
+        for match in CLASS_ATTR_RE.finditer(source):
+            classes.update(TEMPLATE_TAG_RE.sub(' ', match.group(2)).split())
+    return classes
+
+
+def _skip_string(css, position):
+    quote = css[position]
+    position += 1
+    while css[position] != quote:
+        position += 2 if css[position] == '\\' else 1
+    return position + 1
+
+
+def parse_blocks(css):
+    """Разбирает CSS на правила верхнего уровня.
+
+    Возвращает пары (заголовок, тело); у инструкций вроде @charset
+    тело равно None, а у лицензионных комментариев /*! */ — заголовок
+    содержит сам комментарий, а тело равно пустой строке.
+    """
+    blocks = []
+    position = start = 0
+    while position < len(css):
+        char = css[position]
+        if css.startswith('/*', position):
+            end = css.index('*/', position) + 2
+            if css.startswith('/*!', position) and not css[
+                start:position
+            ].strip():
+                blocks.append((css[position:end], ''))
+                start = end
+            position = end
+        elif char in '"\'':
+            position = _skip_string(css, position)
+        elif char == ';':
+            blocks.append((css[start:position].strip(), None))
+            position = start = position + 1
+        elif char == '{':
+            depth = 1
+            body_start = position + 1
+            position += 1
+            while depth:
+                if css[position] in '"\'':
+                    position = _skip_string(css, position)
+                    continue
+                if css.startswith('/*', position):
+                    position = css.index('*/', position) + 2
+                    continue
+                depth += {'{': 1, '}': -1}.get(css[position], 0)
+                position += 1
+            blocks.append((
+                css[start:body_start - 1].strip(),
+                css[body_start:position - 1],
+            ))
+            start = position
+        else:
+            position += 1
+    return [(prelude, body) for prelude, body in blocks if prelude]
+
+
+def split_selectors(prelude):
+    selectors = []
+    depth = start = 0
+    for position, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and not depth:
+            selectors.append(prelude[start:position].strip())
+            start = position + 1
+    selectors.append(prelude[start:].strip())
+    return selectors
+
+
+def selector_classes(selector):
+    """Классы, которые должны быть на странице, чтобы селектор сработал."""
+    return set(SELECTOR_CLASS_RE.findall(NOT_PSEUDO_RE.sub('', selector)))
+
+
+def _used_selectors(prelude, used_classes, critical):
+    return [
+        selector for selector in split_selectors(prelude)
+        if selector_classes(selector) <= used_classes
+        and not (critical and NON_CRITICAL_PSEUDO_RE.search(selector))
+    ]
+
+
+def _purge_block(prelude, body, used_classes, critical):
+    if prelude.startswith('/*!'):
+        return '' if critical else prelude + '\n'
+    if body is None:
+        return '' if critical else prelude + ';'
+    if prelude.startswith(GROUPING_AT_RULES):
+        if critical and 'print' in prelude:
+            return ''
+        inner = purge(body, used_classes, critical)
+        return f'{prelude}{{{inner}}}' if inner else ''
+    if prelude.startswith('@'):
+        return '' if critical else f'{prelude}{{{body}}}'
+    selectors = _used_selectors(prelude, used_classes, critical)
+    return f'{",".join(selectors)}{{{body}}}' if selectors else ''
+
+
+def purge(css, used_classes, critical=False):
+    """Оставляет только правила, все классы которых используются.
+
+    Классы внутри :not() не учитываются. В режиме critical
+    дополнительно отбрасываются печатные стили и состояния вроде
+    :hover, не нужные для первой отрисовки.
+    """
+    return ''.join(
+        _purge_block(prelude, body, used_classes, critical)
+        for prelude, body in parse_blocks(css)
+    )
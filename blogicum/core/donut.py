@@ -0,0 +1,26 @@
+import re
+
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+HOLE_RE = re.compile(rb'<!--hole:([\w/.-]+)-->')
+
+
+def hole_marker(template_name):
+    return mark_safe(f'<!--hole:{template_name}-->')
+
+
+def fill_holes(content, request):
+    """Подставляет в страницу фрагменты, отрендеренные для запроса.
+
+    Каждый шаблон рендерится один раз, даже если метка повторяется.
+    """
+    rendered = {}
+
+    def render(match):
+        name = match.group(1).decode()
+        if name not in rendered:
+            rendered[name] = render_to_string(name, request=request).encode()
+        return rendered[name]
+
+    return HOLE_RE.sub(render, content)
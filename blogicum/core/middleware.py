@@ -0,0 +1,307 @@
+import asyncio
+import gzip
+import mimetypes
+import re
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from core.bus import get_bus
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FAR_FUTURE_MAX_AGE = 60 * 60 * 24 * 365
+SHORT_MAX_AGE = 60
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/xml',
+    'application/rss+xml',
+    'application/atom+xml',
+    'application/javascript',
+)
+MIN_COMPRESS_LENGTH = 200
+
+PRESERVED_BLOCK_RE = _lazy_re_compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.S | re.I
+)
+WHITESPACE_RE = _lazy_re_compile(r'\s+')
+
+
+def _collapse_whitespace(match):
+    return '\n' if '\n' in match.group() else ' '
+
+
+def minify_html(content):
+    """Схлопывает повторяющиеся пробельные символы в HTML.
+
+    Содержимое pre, textarea, script и style не изменяется. Перевод
+    строки сохраняется, поэтому отображение страницы не меняется.
+    """
+    parts = PRESERVED_BLOCK_RE.split(content)
+    result = []
+    # split возвращает текст, затем блок целиком и имя тега — по кругу.
+    for index in range(0, len(parts), 3):
+        result.append(WHITESPACE_RE.sub(_collapse_whitespace, parts[index]))
+        if index + 1 < len(parts):
+            result.append(parts[index + 1])
+    return ''.join(result).strip()
+
+
+def _quality(params):
+    for param in params:
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                return float(value)
+            except ValueError:
+                return 0
+    return 1
+
+
+def accepted_encodings(request, available):
+    """Кодировки из available, которые принимает клиент, по убыванию q.
+
+    Кодировки с q=0 исключаются, '*' задаёт q для не названных явно.
+    При равном q сохраняется порядок available.
+    """
+    qualities = {}
+    for token in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, *params = token.split(';')
+        name = name.strip().lower()
+        if name:
+            qualities[name] = _quality(params)
+    default = qualities.get('*', 0)
+    accepted = [
+        encoding for encoding in available
+        if qualities.get(encoding, default) > 0
+    ]
+    return sorted(
+        accepted, key=lambda encoding: -qualities.get(encoding, default)
+    )
+
+
+def compressor(encoding, level):
+    if encoding == 'br':
+        return brotli.Compressor(quality=level)
+    return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def compress(content, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(content, quality=level)
+    return gzip.compress(content, compresslevel=level)
+
+
+class AsyncCapableMiddleware:
+    """Middleware, которое работает и в синхронной, и в асинхронной цепочке.
+
+    Под ASGI Django переводит в поток всю цепочку после первого
+    синхронного middleware. Здесь process_request и process_response
+    вызываются прямо в цикле событий, поэтому в них не должно быть
+    долгого блокирующего ввода-вывода.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Как в MiddlewareMixin: экземпляр считается корутиной.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        response = self.process_request(request)
+        if response is None:
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        response = self.process_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_request(self, request):
+        return None
+
+    def process_response(self, request, response):
+        return response
+
+
+class StaticFilesMiddleware(AsyncCapableMiddleware):
+    """Отдаёт собранную статику из STATIC_ROOT.
+
+    Файлы с хешем в имени кэшируются клиентом на год. Если клиент
+    принимает сжатые ответы и есть сжатая копия файла, отдаётся она.
+    """
+
+    encodings = {'br': '.br', 'gzip': '.gz'}
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.hashed_names = None
+
+    def process_request(self, request):
+        if request.method in ('GET', 'HEAD') and settings.STATIC_ROOT:
+            if request.path.startswith(settings.STATIC_URL):
+                return self.serve(
+                    request, request.path[len(settings.STATIC_URL):]
+                )
+        return None
+
+    def is_hashed(self, name):
+        if self.hashed_names is None:
+            self.hashed_names = set(
+                getattr(staticfiles_storage, 'hashed_files', {}).values()
+            )
+        return name in self.hashed_names
+
+    def resolve(self, name):
+        try:
+            return safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+
+    def open(self, request, path):
+        """Открывает сжатую копию файла, если клиент её примет.
+
+        Возвращает файл и его кодировку; (None, None), если файла нет.
+        """
+        for encoding in accepted_encodings(request, self.encodings):
+            try:
+                return open(path + self.encodings[encoding], 'rb'), encoding
+            except OSError:
+                continue
+        try:
+            return open(path, 'rb'), None
+        except OSError:
+            return None, None
+
+    def serve(self, request, name):
+        path = self.resolve(name)
+        if path is None:
+            return None
+        file, encoding = self.open(request, path)
+        if file is None:
+            return None
+        content_type, _ = mimetypes.guess_type(path)
+        response = FileResponse(
+            file, content_type=content_type or 'application/octet-stream'
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if self.is_hashed(name):
+            response.headers['Cache-Control'] = (
+                f'public, max-age={FAR_FUTURE_MAX_AGE}, immutable'
+            )
+        else:
+            response.headers['Cache-Control'] = (
+                f'public, max-age={SHORT_MAX_AGE}'
+            )
+        return response
+
+
+class InvalidationBusMiddleware(AsyncCapableMiddleware):
+    """Перед запросом забирает события инвалидации других процессов."""
+
+    def process_request(self, request):
+        get_bus().poll()
+
+    async def __acall__(self, request):
+        bus = get_bus()
+        if bus.is_due():
+            # Чтение транспорта блокирует: в поток, но не чаще раза
+            # в poll_interval, а не на каждый запрос.
+            await sync_to_async(bus.poll, thread_sensitive=False)()
+        return await self.get_response(request)
+
+
+class HtmlMinifyMiddleware(AsyncCapableMiddleware):
+    """Минифицирует HTML-ответы, если включена настройка HTML_MINIFY."""
+
+    def process_response(self, request, response):
+        if (
+            settings.HTML_MINIFY
+            and not response.streaming
+            and not response.has_header('Content-Encoding')
+            and response.get('Content-Type', '').startswith('text/html')
+        ):
+            response.content = minify_html(
+                response.content.decode(response.charset)
+            )
+            if response.has_header('Content-Length'):
+                response.headers['Content-Length'] = str(len(response.content))
+        return response
+
+
+class CompressionMiddleware(AsyncCapableMiddleware):
+    """Сжимает ответы gzip или brotli в зависимости от Accept-Encoding.
+
+    Уровни сжатия задаются настройкой COMPRESSION_LEVELS. Потоковые ответы
+    сжимаются по частям, не собираясь целиком в памяти.
+    """
+
+    def process_response(self, request, response):
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.choose_encoding(request, response)
+        if encoding is None:
+            return response
+        level = settings.COMPRESSION_LEVELS[encoding]
+        if response.streaming:
+            response.streaming_content = self.compress_stream(
+                response.streaming_content, encoding, level
+            )
+            del response.headers['Content-Length']
+        else:
+            compressed = compress(response.content, encoding, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def choose_encoding(self, request, response):
+        if (
+            response.has_header('Content-Encoding')
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or not response.get('Content-Type', '').startswith(
+                COMPRESSIBLE_TYPES
+            )
+            or not response.streaming
+            and len(response.content) < MIN_COMPRESS_LENGTH
+        ):
+            return None
+        available = ('br', 'gzip') if brotli is not None else ('gzip',)
+        accepted = accepted_encodings(request, available)
+        return accepted[0] if accepted else None
+
+    def compress_stream(self, chunks, encoding, level):
+        stream = compressor(encoding, level)
+        for chunk in chunks:
+            data = (
+                stream.process(chunk) if encoding == 'br'
+                else stream.compress(chunk)
+            )
+            if data:
+                yield data
+        yield stream.finish() if encoding == 'br' else stream.flush()
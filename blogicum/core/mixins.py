@@ -0,0 +1,53 @@
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+
+class AsyncViewMixin:
+    """Асинхронный вариант представления для запуска под ASGI.
+
+    Включается настройкой ASYNC_VIEWS. Запросы к базе и рендеринг шаблона
+    выполняются за один переход в синхронный поток, поэтому
+    TemplateResponse не требует отдельного перехода на рендеринг.
+    Подклассы переопределяют async_precheck для ответов, которые можно
+    собрать по данным в памяти процесса: он выполняется без перехода
+    в поток, и если возвращает ответ или бросает Http404,
+    синхронная часть не запускается.
+
+    Middleware проекта работают в цикле событий (AsyncCapableMiddleware),
+    а синхронную панель отладки под ASGI settings не подключает: иначе
+    Django перевёл бы в поток всю цепочку вместе с представлением.
+    Собственные middleware Django 3.2 по-прежнему вызывают свои хуки
+    через sync_to_async.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        if not settings.ASYNC_VIEWS:
+            return view
+
+        def render_view(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+
+        async def async_view(request, *args, **kwargs):
+            response = await cls.async_precheck(request, *args, **kwargs)
+            if response is None:
+                response = await sync_to_async(render_view)(
+                    request, *args, **kwargs
+                )
+            return response
+
+        async_view.view_class = cls
+        async_view.view_initkwargs = initkwargs
+        update_wrapper(async_view, cls, updated=())
+        update_wrapper(async_view, cls.dispatch, assigned=())
+        return async_view
+
+    @classmethod
+    async def async_precheck(cls, request, *args, **kwargs):
+        return None
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+from core.css import SAFELIST, purge, template_classes
+from pages.templatetags.pages_tags import (
+    CRITICAL_TEMPLATES,
+    PURGED_STYLESHEET,
+    SOURCE_STYLESHEET,
+    css_build_dir,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает урезанную таблицу стилей bootstrap по классам из шаблонов '
+        'и critical CSS для первого экрана ленты и страницы поста.'
+    )
+
+    def handle(self, *args, **options):
+        source = finders.find(SOURCE_STYLESHEET)
+        if source is None:
+            raise CommandError(f'Не найден файл {SOURCE_STYLESHEET}.')
+        with open(source, encoding='utf-8') as source_file:
+            css = source_file.read()
+        templates_dir = settings.TEMPLATES_DIR
+        used_classes = template_classes(templates_dir.rglob('*.html'))
+        build_dir = css_build_dir()
+        (build_dir / 'critical').mkdir(parents=True, exist_ok=True)
+
+        purged = purge(css, used_classes | SAFELIST)
+        (build_dir / PURGED_STYLESHEET).write_text(purged, encoding='utf-8')
+        self.stdout.write(
+            f'{PURGED_STYLESHEET}: {len(css)} -> {len(purged)} байт'
+        )
+        for page, templates in CRITICAL_TEMPLATES.items():
+            critical = purge(
+                css,
+                template_classes(templates_dir / name for name in templates),
+                critical=True,
+            )
+            path = build_dir / 'critical' / f'{page}.css'
+            path.write_text(critical, encoding='utf-8')
+            self.stdout.write(f'critical/{page}.css: {len(critical)} байт')
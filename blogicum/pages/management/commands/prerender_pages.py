@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from pages.prerender import prerender_pages
+
+
+class Command(BaseCommand):
+    help = 'Рендерит статические страницы и страницы ошибок в файлы.'
+
+    def handle(self, *args, **options):
+        for path in prerender_pages():
+            self.stdout.write(str(path))
@@ -0,0 +1,154 @@
+import gzip
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.html import escape
+
+from core.middleware import accepted_encodings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+USERNAME_PLACEHOLDER = 'prerender-username-placeholder'
+URI_PLACEHOLDER = 'prerender-absolute-uri-placeholder'
+
+PAGES = {
+    'about': ('pages/about.html', 'pages:about'),
+    'rules': ('pages/rules.html', 'pages:rules'),
+    '404': ('pages/404.html', None),
+    '500': ('pages/500.html', None),
+    '403csrf': ('pages/403csrf.html', None),
+}
+VARIANTS = ('anonymous', 'user')
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+_loaded = {}
+
+
+def _page_path(name, variant):
+    return settings.PRERENDER_ROOT / f'{name}.{variant}.html'
+
+
+def _read(path):
+    """Содержимое файла из памяти процесса; None, если файла нет.
+
+    Файл перечитывается, только когда сменилось время его изменения.
+    """
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    loaded = _loaded.get(path)
+    if loaded is None or loaded[0] != mtime:
+        try:
+            loaded = (mtime, path.read_bytes())
+        except FileNotFoundError:
+            return None
+        _loaded[path] = loaded
+    return loaded[1]
+
+
+def _render(template_name, url_name, variant):
+    request = RequestFactory().get(
+        reverse(url_name) if url_name else '/'
+    )
+    request.resolver_match = resolve(request.path) if url_name else None
+    request.build_absolute_uri = lambda location=None: URI_PLACEHOLDER
+    if variant == 'user':
+        request.user = SimpleNamespace(
+            is_authenticated=True, username=USERNAME_PLACEHOLDER
+        )
+    else:
+        request.user = AnonymousUser()
+    return render_to_string(
+        template_name, {'user': request.user}, request=request
+    )
+
+
+def prerender_pages():
+    """Рендерит статические страницы в файлы, возвращает их список.
+
+    Для анонимного варианта без подстановок рядом кладутся сжатые
+    копии .gz и, если установлен brotli, .br.
+    """
+    settings.PRERENDER_ROOT.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, (template_name, url_name) in PAGES.items():
+        for variant in VARIANTS:
+            path = _page_path(name, variant)
+            content = _render(template_name, url_name, variant).encode()
+            path.write_bytes(content)
+            written.append(path)
+            if URI_PLACEHOLDER.encode() in content or variant == 'user':
+                continue
+            gz_path = path.with_name(path.name + '.gz')
+            gz_path.write_bytes(gzip.compress(content, compresslevel=9))
+            written.append(gz_path)
+            if brotli is not None:
+                br_path = path.with_name(path.name + '.br')
+                br_path.write_bytes(brotli.compress(content))
+                written.append(br_path)
+    return written
+
+
+def prerendered_response(request, name, status=200, user=None):
+    """Готовый ответ из заранее отрендеренной страницы.
+
+    Возвращает None, если страница не была собрана. user передают,
+    когда пользователь уже известен и request.user трогать не нужно.
+    """
+    if user is None:
+        user = getattr(request, 'user', None)
+    variant = 'user' if user and user.is_authenticated else 'anonymous'
+    path = _page_path(name, variant)
+    page = _read(path)
+    if page is None:
+        return None
+    for encoding in accepted_encodings(request, ENCODINGS):
+        compressed = _read(path.with_name(path.name + ENCODINGS[encoding]))
+        if compressed is not None:
+            response = HttpResponse(compressed, status=status)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        content = page.decode('utf-8')
+        if variant == 'user':
+            content = content.replace(
+                USERNAME_PLACEHOLDER, escape(user.username)
+            )
+        content = content.replace(
+            URI_PLACEHOLDER, escape(request.build_absolute_uri())
+        )
+        response = HttpResponse(content, status=status)
+    patch_vary_headers(response, ('Accept-Encoding', 'Cookie'))
+    return response
+
+
+class PrerenderedPageMixin:
+    """Отдаёт страницу из собранного файла, если он есть."""
+
+    prerendered_name = None
+
+    @classmethod
+    async def async_precheck(cls, request, *args, **kwargs):
+        # Без cookie сессии пользователь точно анонимный: страница
+        # отдаётся из памяти процесса без перехода в синхронный поток.
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return None
+        return prerendered_response(
+            request, cls.prerendered_name, user=AnonymousUser()
+        )
+
+    def get(self, request, *args, **kwargs):
+        response = prerendered_response(request, self.prerendered_name)
+        if response is None:
+            return super().get(request, *args, **kwargs)
+        return response
@@ -0,0 +1,99 @@
+import os
+
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from core.donut import hole_marker
+
+register = template.Library()
+
+SOURCE_STYLESHEET = 'css/bootstrap.min.css'
+PURGED_STYLESHEET = 'bootstrap.purged.css'
+BUILD_PREFIX = 'build'
+
+CRITICAL_TEMPLATES = {
+    'feed': (
+        'base.html',
+        'includes/header.html',
+        'includes/post_card.html',
+        'includes/category_link.html',
+    ),
+    'detail': (
+        'base.html',
+        'includes/header.html',
+        'blog/detail.html',
+        'includes/category_link.html',
+    ),
+}
+CRITICAL_PAGES = {
+    'blog:index': 'feed',
+    'blog:category_posts': 'feed',
+    'blog:profile': 'feed',
+    'blog:post_detail': 'detail',
+}
+
+_critical_css = {}
+
+
+def css_build_dir():
+    """Каталог собранных стилей внутри первого из STATICFILES_DIRS."""
+    return settings.STATICFILES_DIRS[0] / BUILD_PREFIX
+
+
+def _read_critical(page):
+    path = css_build_dir() / 'critical' / f'{page}.css'
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    cached = _critical_css.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, encoding='utf-8') as critical_file:
+            cached = (mtime, critical_file.read().replace('</', '<\\/'))
+        _critical_css[path] = cached
+    return cached[1]
+
+
+@register.simple_tag(takes_context=True)
+def stylesheet(context):
+    """Подключает стили страницы.
+
+    Если собрана урезанная таблица стилей, для ленты и страницы поста
+    встраивается critical CSS, а остальное загружается без блокировки
+    отрисовки. Иначе подключается полный bootstrap.
+    """
+    if not os.path.exists(css_build_dir() / PURGED_STYLESHEET):
+        return format_html(
+            '<link rel="stylesheet" href="{}">', static(SOURCE_STYLESHEET)
+        )
+    href = static(f'{BUILD_PREFIX}/{PURGED_STYLESHEET}')
+    request = context.get('request')
+    match = getattr(request, 'resolver_match', None)
+    page = CRITICAL_PAGES.get(match.view_name) if match else None
+    critical = _read_critical(page) if page else None
+    if critical is None:
+        return format_html('<link rel="stylesheet" href="{}">', href)
+    return format_html(
+        '<style>{}</style>'
+        '<link rel="preload" href="{}" as="style"'
+        ' onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(critical),
+        href,
+        href,
+    )
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, template_name):
+    """Персональный фрагмент страницы, например шапка с именем пользователя.
+
+    В странице для общего кэша вместо фрагмента остаётся метка, которую
+    заполняют при каждом запросе.
+    """
+    if context.get('donut'):
+        return hole_marker(template_name)
+    return context.template.engine.get_template(template_name).render(context)
@@ -41,6 +41,21 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    from blog.cache import invalidate_categories
+    from blog.counters import view_counter
+
+    cache.clear()
+    invalidate_categories()
+    # Журнал просмотров очищен вместе с кэшем, фоновый сброс не нужен.
+    view_counter.log = None
+    view_counter.last_flush = time.monotonic()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -0,0 +1,72 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_api_posts_visibility(
+        client, post_with_published_location, future_posts,
+        posts_with_unpublished_category):
+    response = client.get('/api/posts/')
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert [item['id'] for item in results] == [
+        post_with_published_location.id
+    ]
+    assert results[0]['author'] == post_with_published_location.author.username
+    assert 'text' not in results[0]
+
+
+def test_api_posts_cursor_pagination(
+        client, many_posts_with_published_locations):
+    seen = []
+    url = '/api/posts/?limit=7&fields=id,pub_date'
+    while url:
+        data = client.get(url).json()
+        assert len(data['results']) <= 7
+        assert all(set(item) == {'id', 'pub_date'} for item in data['results'])
+        seen.extend(item['id'] for item in data['results'])
+        url = data['next']
+    expected = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id),
+        reverse=True,
+    )
+    assert seen == [post.id for post in expected]
+
+
+def test_api_errors(client, post_with_published_location):
+    assert client.get('/api/posts/?fields=password').status_code == 400
+    assert client.get('/api/posts/?cursor=broken').status_code == 400
+    response = client.get('/api/posts/0/')
+    assert response.status_code == 404
+    assert response.json() == {'error': 'Не найдено.'}
+
+
+def test_api_post_detail_and_comments(client, comment_to_a_post):
+    post = comment_to_a_post.post
+    data = client.get(f'/api/posts/{post.id}/').json()
+    assert data['text'] == post.text
+    assert data['comment_count'] == 1
+    comments = client.get(f'/api/posts/{post.id}/comments/').json()
+    assert comments['results'][0]['text'] == comment_to_a_post.text
+
+
+def test_api_categories_and_locations(
+        client, post_with_published_location, posts_with_unpublished_category):
+    post = post_with_published_location
+    slugs = [
+        item['slug'] for item in client.get('/api/categories/').json()[
+            'results'
+        ]
+    ]
+    assert slugs == [post.category.slug]
+    hidden_slug = posts_with_unpublished_category[0].category.slug
+    assert client.get(
+        f'/api/categories/{hidden_slug}/posts/'
+    ).status_code == 404
+    names = [
+        item['name'] for item in client.get('/api/locations/').json()[
+            'results'
+        ]
+    ]
+    assert post.location.name in names
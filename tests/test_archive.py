@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.archive import rebuild_archive
+from blog.models import ArchiveMonth
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _counts():
+    return {
+        (bucket.year, bucket.month): bucket.post_count
+        for bucket in ArchiveMonth.objects.filter(post_count__gt=0)
+    }
+
+
+@pytest.fixture
+def february_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.make_aware(datetime(2024, 2, 10, 12)),
+    )
+
+
+def test_archive_counts_maintained_incrementally(february_post):
+    assert _counts() == {(2024, 2): 1}
+    february_post.pub_date = timezone.make_aware(datetime(2024, 3, 1))
+    february_post.save()
+    assert _counts() == {(2024, 3): 1}
+    february_post.is_published = False
+    february_post.save()
+    assert _counts() == {}
+    february_post.is_published = True
+    february_post.save()
+    february_post.delete()
+    assert _counts() == {}
+
+
+def test_deferred_post_unpublished_after_going_live(
+        monkeypatch, mixer, user, published_category):
+    pub_date = timezone.now() + timedelta(hours=1)
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_date,
+    )
+    assert _counts() == {}
+    later = pub_date + timedelta(hours=1)
+    monkeypatch.setattr('blog.archive.timezone.now', lambda: later)
+    monkeypatch.setattr('blog.models.timezone.now', lambda: later)
+    post.is_published = False
+    post.save()
+    assert _counts() == {}
+    post.is_published = True
+    post.save()
+    local = timezone.localtime(pub_date)
+    assert _counts() == {(local.year, local.month): 1}
+    post.delete()
+    assert _counts() == {}
+
+
+def test_archive_matches_rebuild(
+        february_post, posts_with_unpublished_category, future_posts):
+    counts = _counts()
+    rebuild_archive()
+    assert _counts() == counts == {(2024, 2): 1}
+
+
+def test_category_unpublish_rebuilds_archive(february_post):
+    category = february_post.category
+    category.is_published = False
+    category.save()
+    assert _counts() == {}
+
+
+def test_archive_month_view(client, february_post):
+    response = client.get(
+        reverse('blog:archive_month', kwargs={'year': 2024, 'month': 2})
+    )
+    assert list(response.context['page_obj']) == [february_post]
+    assert reverse(
+        'blog:archive_month', kwargs={'year': 2024, 'month': 2}
+    ) in response.content.decode('utf-8')
+    response = client.get(
+        reverse('blog:archive_month', kwargs={'year': 2024, 'month': 3})
+    )
+    assert not response.context['page_obj']
+    response = client.get(reverse('blog:archive_year', kwargs={'year': 2024}))
+    assert list(response.context['page_obj']) == [february_post]
+
+
+def test_archive_bad_month_404(client):
+    response = client.get(
+        reverse('blog:archive_month', kwargs={'year': 2024, 'month': 13})
+    )
+    assert response.status_code == 404
@@ -0,0 +1,181 @@
+import asyncio
+import importlib
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory, override_settings
+from django.urls import clear_url_caches
+
+from blog.cache import get_published_categories
+from blog.views import CategoryPostListView, PostDetailView, PostListView
+from core.bus import get_bus
+from pages.views import About
+
+URL_MODULES = ('pages.urls', 'blog.urls', 'blogicum.urls')
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _reload_urls():
+    for name in URL_MODULES:
+        importlib.reload(importlib.import_module(name))
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_urls():
+    """URLconf и middleware с ASYNC_VIEWS=True, как под ASGI."""
+    middleware = [
+        name for name in settings.MIDDLEWARE
+        if not name.startswith('debug_toolbar.')
+    ]
+    with override_settings(ASYNC_VIEWS=True, MIDDLEWARE=middleware):
+        _reload_urls()
+        yield
+    _reload_urls()
+
+
+async def _asgi_get(path):
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    await ASGIHandler()(
+        {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'root_path': '',
+            'query_string': b'',
+            'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 1),
+            'server': ('testserver', 80),
+        },
+        receive,
+        send,
+    )
+    return messages
+
+
+def _get(view, path, **kwargs):
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    return async_to_sync(view)(request, **kwargs)
+
+
+@override_settings(ASYNC_VIEWS=True)
+def test_views_are_async_under_asgi():
+    for view_class in (
+        PostListView, CategoryPostListView, PostDetailView, About
+    ):
+        view = view_class.as_view()
+        assert asyncio.iscoroutinefunction(view)
+        assert view.view_class is view_class
+
+
+def test_views_stay_sync_by_default():
+    assert not asyncio.iscoroutinefunction(PostListView.as_view())
+
+
+@override_settings(ASYNC_VIEWS=True)
+def test_async_views_render(post_with_published_location):
+    post = post_with_published_location
+    response = _get(PostListView.as_view(), '/')
+    assert response.status_code == 200
+    assert post.title in response.content.decode('utf-8')
+    response = _get(
+        PostDetailView.as_view(), f'/posts/{post.id}/', post_id=post.id
+    )
+    assert post.title in response.content.decode('utf-8')
+    response = _get(About.as_view(), '/pages/about/')
+    assert response.status_code == 200
+
+
+@override_settings(ASYNC_VIEWS=True)
+def test_async_category_404_from_local_cache(
+        post_with_published_location, django_assert_num_queries):
+    get_published_categories()
+    with django_assert_num_queries(0):
+        with pytest.raises(Http404):
+            _get(
+                CategoryPostListView.as_view(),
+                '/category/missing/',
+                category_slug='missing',
+            )
+
+
+@override_settings(ASYNC_VIEWS=True)
+def test_async_prerendered_page_from_memory(
+        tmp_path, monkeypatch, django_assert_num_queries):
+    with override_settings(PRERENDER_ROOT=tmp_path):
+        call_command('prerender_pages', stdout=StringIO())
+        view = About.as_view()
+
+        def no_thread(*args, **kwargs):
+            raise AssertionError('Переход в синхронный поток')
+
+        monkeypatch.setattr('core.mixins.sync_to_async', no_thread)
+        with django_assert_num_queries(0):
+            response = _get(view, '/pages/about/')
+    assert response.status_code == 200
+    assert 'Войти' in response.content.decode('utf-8')
+
+
+def test_middleware_stays_in_event_loop_under_asgi(
+        async_urls, tmp_path, monkeypatch):
+    in_loop = []
+
+    def minify(content):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            in_loop.append(False)
+        else:
+            in_loop.append(True)
+        return content
+
+    def no_thread(*args, **kwargs):
+        raise AssertionError('Переход в синхронный поток')
+
+    monkeypatch.setattr('core.middleware.minify_html', minify)
+    monkeypatch.setattr('core.mixins.sync_to_async', no_thread)
+    monkeypatch.setattr(get_bus(), 'is_due', lambda: False)
+    with override_settings(PRERENDER_ROOT=tmp_path, HTML_MINIFY=True):
+        call_command('prerender_pages', stdout=StringIO())
+        messages = async_to_sync(_asgi_get)('/pages/about/')
+    assert messages[0]['status'] == 200
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    assert 'Войти' in body.decode('utf-8')
+    assert in_loop == [True]
+
+
+def test_async_middleware_polls_bus_when_due(async_urls, monkeypatch):
+    polled = []
+    monkeypatch.setattr(get_bus(), 'is_due', lambda: True)
+    monkeypatch.setattr(get_bus(), 'poll', lambda: polled.append(True))
+    messages = async_to_sync(_asgi_get)('/pages/about/')
+    assert messages[0]['status'] == 200
+    assert polled == [True]
+
+
+def test_loadtest_command(live_server, post_with_published_location):
+    out = StringIO()
+    call_command(
+        'loadtest', live_server.url, requests=10, concurrency=2, stdout=out
+    )
+    assert 'запросов/с' in out.getvalue()
+    assert 'ошибок: 0' in out.getvalue()
@@ -0,0 +1,62 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.mixins import DonutCacheMixin
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _category_queries(captured):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if 'FROM "blog_category"' in query['sql']
+    ]
+
+
+def test_category_page_uses_cached_category(
+        monkeypatch, client, post_with_published_location,
+        published_category):
+    # Страница целиком не кэшируется: проверяется кэш данных под ней.
+    monkeypatch.setattr(DonutCacheMixin, 'donut_timeout', 0)
+    url = f'/category/{published_category.slug}/'
+    assert client.get(url).status_code == 200
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert response.context['category'] == published_category
+    assert not _category_queries(captured)
+
+
+def test_category_cache_invalidated_on_save(
+        client, post_with_published_location, published_category):
+    url = f'/category/{published_category.slug}/'
+    assert client.get(url).status_code == 200
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(url).status_code == 404
+
+
+def test_detail_category_link_without_category_query(
+        client, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    assert client.get(url).status_code == 200
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert post_with_published_location.category.slug in (
+        response.content.decode('utf-8')
+    )
+    assert not _category_queries(captured)
+
+
+def test_hidden_category_404_without_post_queries(
+        client, posts_with_unpublished_category):
+    slug = posts_with_unpublished_category[0].category.slug
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(f'/category/{slug}/')
+    assert response.status_code == 404
+    assert not [
+        query for query in captured.captured_queries
+        if 'FROM "blog_post"' in query['sql']
+    ]
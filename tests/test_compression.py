@@ -0,0 +1,75 @@
+import gzip
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.middleware import accepted_encodings, minify_html
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_minify_keeps_preformatted_blocks():
+    html = (
+        '<div>\n    <p>Текст   с\tпробелами</p>\n</div>\n'
+        '<pre>  a\n    b</pre><textarea name="t">\n  x  y\n</textarea>'
+    )
+    assert minify_html(html) == (
+        '<div>\n<p>Текст с пробелами</p>\n</div>\n'
+        '<pre>  a\n    b</pre><textarea name="t">\n  x  y\n</textarea>'
+    )
+
+
+def test_html_minified_and_gzipped(client, post_with_published_location):
+    with override_settings(HTML_MINIFY=False):
+        raw = client.get(reverse('blog:index')).content
+    response = client.get(reverse('blog:index'), HTTP_ACCEPT_ENCODING='gzip')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    content = gzip.decompress(response.content)
+    assert len(content) < len(raw)
+    assert post_with_published_location.title.encode() in content
+
+
+@pytest.mark.parametrize('header, expected', (
+    ('gzip, br', ['br', 'gzip']),
+    ('br;q=0, gzip', ['gzip']),
+    ('gzip;q=0.5, br;q=0.8', ['br', 'gzip']),
+    ('br;q=0.2, gzip;q=1.0', ['gzip', 'br']),
+    ('*', ['br', 'gzip']),
+    ('*;q=0, gzip', ['gzip']),
+    ('identity', []),
+    ('', []),
+))
+def test_accepted_encodings(header, expected):
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=header)
+    assert accepted_encodings(request, ('br', 'gzip')) == expected
+
+
+def test_refused_encoding_not_used(client, post_with_published_location):
+    response = client.get(
+        reverse('blog:index'), HTTP_ACCEPT_ENCODING='gzip;q=0'
+    )
+    assert not response.has_header('Content-Encoding')
+
+
+def test_identity_not_compressed(client, post_with_published_location):
+    response = client.get(reverse('blog:index'))
+    assert not response.has_header('Content-Encoding')
+
+
+def test_streaming_feed_gzipped(client, post_with_published_location):
+    response = client.get(reverse('blog:feed'), HTTP_ACCEPT_ENCODING='gzip')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'].startswith('W/')
+    content = gzip.decompress(b''.join(response.streaming_content))
+    assert post_with_published_location.title.encode() in content
+
+
+def test_bench_html_command(post_with_published_location):
+    out = StringIO()
+    call_command('bench_html', iterations=1, stdout=out)
+    assert 'gzip 6' in out.getvalue()
@@ -0,0 +1,84 @@
+import shutil
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.test.utils import override_settings
+
+from core.css import purge, template_classes
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def css_built(tmp_path):
+    shutil.copytree(settings.STATICFILES_DIRS[0] / 'css', tmp_path / 'css')
+    with override_settings(STATICFILES_DIRS=[tmp_path]):
+        call_command('build_css', stdout=StringIO())
+        yield tmp_path
+
+
+def test_purge_keeps_only_used_rules():
+    css = (
+        '@charset "UTF-8";/*! license */'
+        'body{margin:0}.used{color:red}.unused{color:blue}'
+        '.used,.unused>a{top:0}.used:hover{color:green}'
+        '@media (min-width:576px){.unused{left:0}.used{left:1px}}'
+        '@media print{.used{display:none}}'
+    )
+    assert purge(css, {'used'}) == (
+        '@charset "UTF-8";/*! license */\n'
+        'body{margin:0}.used{color:red}.used{top:0}.used:hover{color:green}'
+        '@media (min-width:576px){.used{left:1px}}'
+        '@media print{.used{display:none}}'
+    )
+    assert purge(css, {'used'}, critical=True) == (
+        'body{margin:0}.used{color:red}.used{top:0}'
+        '@media (min-width:576px){.used{left:1px}}'
+    )
+
+
+def test_purge_ignores_classes_inside_not():
+    css = (
+        '.input-group:not(.has-validation)>.form-control{left:0}'
+        '.input-group:not(.used)>.missing{top:0}'
+    )
+    assert purge(css, {'input-group', 'form-control'}) == (
+        '.input-group:not(.has-validation)>.form-control{left:0}'
+    )
+
+
+def test_template_classes_in_both_quote_styles(tmp_path):
+    template = tmp_path / 'page.html'
+    template.write_text(
+        '<div class="card {% if x == \'a\' %}active{% endif %}">'
+        "<p class='lead text-muted'></p></div>",
+        encoding='utf-8',
+    )
+    assert template_classes([template]) == {
+        'card', 'active', 'lead', 'text-muted'
+    }
+
+
+def test_build_css_writes_smaller_stylesheets(css_built):
+    original = (css_built / 'css' / 'bootstrap.min.css').stat().st_size
+    purged = css_built / 'build' / 'bootstrap.purged.css'
+    assert purged.stat().st_size < original / 3
+    assert '.card-title' in purged.read_text()
+    assert '.carousel' not in purged.read_text()
+    assert (css_built / 'build' / 'critical' / 'feed.css').exists()
+
+
+def test_feed_inlines_critical_css(css_built, client, published_category):
+    content = client.get('/').content.decode('utf-8')
+    assert '<style>' in content
+    assert 'rel="preload" href="/static/build/bootstrap.purged.css"' in content
+    assert 'bootstrap.min.css' not in content
+
+    content = client.get('/pages/about/').content.decode('utf-8')
+    assert '<style>' not in content
+    assert (
+        '<link rel="stylesheet" href="/static/build/bootstrap.purged.css">'
+        in content
+    )
@@ -0,0 +1,68 @@
+import hashlib
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _post_queries(captured):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if 'FROM "blog_post"' in query['sql']
+    ]
+
+
+def test_page_shared_between_users(
+        client, user, user_client, post_with_published_location):
+    url = reverse('blog:index')
+    anonymous = client.get(url).content.decode()
+    assert 'Войти' in anonymous
+    with CaptureQueriesContext(connection) as captured:
+        personal = user_client.get(url).content.decode()
+    assert not _post_queries(captured)
+    assert user.username in personal
+    assert 'Войти' not in personal
+    assert post_with_published_location.title in personal
+    assert 'Войти' in client.get(url).content.decode()
+
+
+def test_cached_page_keeps_hole_marker(
+        user_client, post_with_published_location):
+    url = reverse('blog:index')
+    user_client.get(url)
+    page = cache.get(f'blog:donut:{hashlib.md5(url.encode()).hexdigest()}')
+    assert b'<!--hole:includes/header.html-->' in page['content']
+    assert f'post-{post_with_published_location.pk}' in page['keys']
+
+
+def test_key_ignores_unused_query_params(
+        client, post_with_published_location):
+    url = reverse('blog:index')
+    client.get(f'{url}?utm_source=mail&page=1')
+    client.get(f'{url}?page=1&fbclid=abc')
+    client.get(f'{url}?page=1')
+    path = f'{url}?page=1'.encode()
+    assert cache.get(f'blog:donut:{hashlib.md5(path).hexdigest()}')
+    other = f'{url}?utm_source=mail&page=1'.encode()
+    assert cache.get(f'blog:donut:{hashlib.md5(other).hexdigest()}') is None
+
+
+def test_page_invalidated_by_post_change(
+        client, post_with_published_location):
+    url = reverse('blog:index')
+    client.get(url)
+    post_with_published_location.title = 'Новый заголовок'
+    post_with_published_location.save()
+    assert 'Новый заголовок' in client.get(url).content.decode()
+
+
+def test_page_invalidated_by_comment(
+        mixer, user, client, post_with_published_location):
+    url = reverse('blog:index')
+    assert 'Комментарии (0)' in client.get(url).content.decode()
+    mixer.blend('blog.Comment', post=post_with_published_location, author=user)
+    assert 'Комментарии (1)' in client.get(url).content.decode()
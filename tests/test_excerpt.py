@@ -0,0 +1,39 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from blog.consts import EXCERPT_WORDS
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = ' '.join(f'слово{number}' for number in range(200))
+
+
+def test_excerpt_generated_on_save(post_with_published_location):
+    post = post_with_published_location
+    post.text = LONG_TEXT
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == ' '.join(LONG_TEXT.split()[:EXCERPT_WORDS]) + '…'
+
+
+def test_backfill_excerpts_in_batches(many_posts_with_published_locations):
+    Post.objects.update(excerpt='')
+    out = StringIO()
+    call_command('backfill_excerpts', batch_size=7, stdout=out)
+    assert out.getvalue().count('Обработано постов') == 3
+    assert not Post.objects.filter(excerpt='').exists()
+
+
+def test_api_returns_excerpt(client, post_with_published_location):
+    response = client.get(
+        reverse(
+            'blog:api_post_detail',
+            kwargs={'post_id': post_with_published_location.pk},
+        ),
+        {'fields': 'id,excerpt'},
+    )
+    assert response.json()['excerpt'] == post_with_published_location.excerpt
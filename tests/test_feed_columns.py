@@ -0,0 +1,27 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feed_query_loads_only_card_columns(
+        client, many_posts_with_published_locations):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('blog:index'))
+    assert len(response.context['page_obj']) == 10
+    sql = ' '.join(query['sql'] for query in queries.captured_queries)
+    assert '"auth_user"."password"' not in sql
+    assert '"blog_post"."text"' not in sql
+    post_queries = [
+        query for query in queries.captured_queries
+        if query['sql'].startswith('SELECT') and 'blog_post' in query['sql']
+    ]
+    assert len(post_queries) <= 3
+
+
+def test_card_shows_excerpt(client, post_with_published_location):
+    content = client.get(reverse('blog:index')).content.decode('utf-8')
+    words = post_with_published_location.text.split()[:3]
+    assert ' '.join(words) in content
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.feeds import FEED_ALL, _snapshot_key
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _content(response):
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+@pytest.mark.parametrize('suffix', ['', 'atom/'])
+def test_feeds_list_published_posts(
+        client, suffix, post_with_published_location, future_posts,
+        posts_with_unpublished_category):
+    post = post_with_published_location
+    urls = (
+        f'/feed/{suffix}',
+        f'/category/{post.category.slug}/feed/{suffix}',
+        f'/profile/{post.author.username}/feed/{suffix}',
+    )
+    for url in urls:
+        response = client.get(url)
+        assert response.status_code == 200, url
+        assert response.streaming
+        content = _content(response)
+        assert f'/posts/{post.id}/' in content
+        for hidden in future_posts + posts_with_unpublished_category:
+            assert f'/posts/{hidden.id}/' not in content
+
+
+def test_feed_conditional_get(client, post_with_published_location):
+    response = client.get('/feed/')
+    _content(response)
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(
+            '/feed/', HTTP_IF_NONE_MATCH=response.headers['ETag']
+        )
+    assert response.status_code == 304
+    assert not captured.captured_queries
+
+
+def test_feed_snapshot_updated_incrementally(
+        client, mixer, user, published_category, post_with_published_location):
+    _content(client.get('/feed/'))
+    new_post = mixer.blend(
+        'blog.Post', author=user, category=published_category
+    )
+    assert f'/posts/{new_post.id}/' in _content(client.get('/feed/'))
+
+    new_post.is_published = False
+    new_post.save()
+    assert f'/posts/{new_post.id}/' not in _content(client.get('/feed/'))
+
+
+def test_feed_picks_up_deferred_post(
+        client, mixer, user, published_category, post_with_published_location):
+    deferred = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    assert f'/posts/{deferred.id}/' not in _content(client.get('/feed/'))
+    type(deferred).objects.filter(pk=deferred.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    # Имитируем наступление даты публикации для уже построенного снимка.
+    key = _snapshot_key(FEED_ALL, None)
+    snapshot = cache.get(key)
+    snapshot['next_pub_date'] = timezone.now() - timedelta(minutes=1)
+    snapshot['checked_at'] = timezone.now() - timedelta(hours=1)
+    cache.set(key, snapshot)
+    assert f'/posts/{deferred.id}/' in _content(client.get('/feed/'))
+
+
+def test_feeds_404(client, posts_with_unpublished_category):
+    slug = posts_with_unpublished_category[0].category.slug
+    assert client.get(f'/category/{slug}/feed/').status_code == 404
+    assert client.get('/profile/nobody-here/feed/').status_code == 404
+
+
+@pytest.mark.parametrize('feed_items', [10, 1])
+def test_deleted_post_removed_from_feeds(
+        client, monkeypatch, feed_items, mixer, user, published_category,
+        post_with_published_location):
+    monkeypatch.setattr('blog.feeds.FEED_ITEMS', feed_items)
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() - timedelta(minutes=1),
+    )
+    urls = (
+        '/feed/',
+        f'/category/{published_category.slug}/feed/',
+        f'/profile/{user.username}/feed/',
+    )
+    for url in urls:
+        assert f'/posts/{post.id}/' in _content(client.get(url)), url
+    post_id = post.id
+    post.delete()
+    for url in urls:
+        content = _content(client.get(url))
+        assert f'/posts/{post_id}/' not in content, url
+        # Из полной ленты пост ушёл, и на его место встал следующий.
+        assert f'/posts/{post_with_published_location.id}/' in content, url
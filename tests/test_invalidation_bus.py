@@ -0,0 +1,101 @@
+from time import monotonic, sleep
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache, caches
+
+from blog.cache import get_published_categories
+from blog.consts import CATEGORIES_CACHE_KEY
+from blog.models import Category
+from core.bus import CacheBus, SQLiteBus, get_bus
+
+
+def _listen(bus, topic='posts'):
+    received = []
+    bus.subscribe(topic, received.append)
+    return received
+
+
+@pytest.mark.parametrize('transport', ('sqlite', 'cache'))
+def test_event_delivered_to_other_processes(transport, tmp_path):
+    if transport == 'sqlite':
+        first = SQLiteBus(tmp_path / 'bus.sqlite3')
+        second = SQLiteBus(tmp_path / 'bus.sqlite3')
+    else:
+        caches['shared'].clear()
+        first, second = CacheBus(), CacheBus()
+    own = _listen(first)
+    other = _listen(second)
+    first.publish('posts', [1, 2])
+    assert own == [[1, 2]]
+    assert other == []
+    first.flush()
+    second.poll(force=True)
+    first.poll(force=True)
+    assert other == [[1, 2]]
+    assert own == [[1, 2]]
+
+
+def test_new_process_skips_old_events(tmp_path):
+    path = tmp_path / 'bus.sqlite3'
+    early = SQLiteBus(path)
+    early.publish('posts', [1])
+    early.flush()
+    late = SQLiteBus(path)
+    received = _listen(late)
+    late.poll(force=True)
+    assert received == []
+
+
+def test_poll_rate_limited(tmp_path):
+    path = tmp_path / 'bus.sqlite3'
+    first = SQLiteBus(path)
+    second = SQLiteBus(path, poll_interval=60)
+    received = _listen(second)
+    second.poll()
+    first.publish('posts', [1])
+    first.flush()
+    second.poll()
+    assert received == []
+    second.poll(force=True)
+    assert received == [[1]]
+
+
+@pytest.mark.django_db
+def test_other_process_drops_local_categories(
+        client, post_with_published_location, published_category):
+    url = f'/category/{published_category.slug}/'
+    get_published_categories()
+    other_process = SQLiteBus(settings.INVALIDATION_BUS['OPTIONS']['path'])
+    # Другой процесс снял категорию с публикации и сбросил общий кэш.
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=False
+    )
+    cache.delete(CATEGORIES_CACHE_KEY)
+    assert client.get(url).status_code == 200
+    other_process.publish('categories')
+    other_process.flush()
+    get_bus().polled_at = 0
+    assert client.get(url).status_code == 404
+
+
+def test_events_sent_in_background_batches(tmp_path):
+    path = tmp_path / 'bus.sqlite3'
+    first = SQLiteBus(path, send_delay=0.5)
+    second = SQLiteBus(path)
+    received = _listen(second)
+    for number in range(3):
+        first.publish('posts', [number])
+    deadline = monotonic() + 5
+    while len(received) < 3 and monotonic() < deadline:
+        sleep(0.01)
+        second.poll(force=True)
+    assert received == [[0], [1], [2]]
+    assert first.sent == 1
+
+
+def test_forked_process_gets_own_origin(tmp_path, monkeypatch):
+    bus = SQLiteBus(tmp_path / 'bus.sqlite3')
+    parent = bus.origin
+    monkeypatch.setattr('core.bus.os.getpid', lambda: -1)
+    assert bus.origin != parent
@@ -0,0 +1,37 @@
+import re
+
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+
+from blog.consts import POSTS_ON_PAGE
+
+TOTAL_POSTS = 1_000_000
+
+
+class ElidedOnlyPaginator(Paginator):
+    """Пагинатор, который не даёт перебрать все номера страниц."""
+
+    @property
+    def page_range(self):
+        raise AssertionError('Шаблон перебирает все страницы')
+
+
+def _render(number):
+    page_obj = ElidedOnlyPaginator(range(TOTAL_POSTS), POSTS_ON_PAGE).page(
+        number
+    )
+    return render_to_string('includes/paginator.html', {'page_obj': page_obj})
+
+
+def test_paginator_output_constant_at_million_posts():
+    last = TOTAL_POSTS // POSTS_ON_PAGE
+    sizes = {}
+    for number in (1, 2, last // 2, last - 1, last):
+        html = _render(number)
+        links = re.findall(r'\?page=(\d+)', html)
+        assert len(links) <= 12
+        assert f'>{last}<' in html
+        assert f'>{number}<' in html
+        sizes[number] = len(html)
+    assert max(sizes.values()) < 3000
+    assert max(sizes.values()) - min(sizes.values()) < 1000
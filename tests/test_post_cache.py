@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.mixins import DonutCacheMixin
+from blog.models import Post
+from blog.post_cache import get_post_ids, get_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_cards_restored_from_cache(many_posts_with_published_locations):
+    ids = [post.pk for post in many_posts_with_published_locations[:5]]
+    expected = {
+        post.pk: post for post in Post.objects.for_cards().filter(pk__in=ids)
+    }
+    with CaptureQueriesContext(connection) as queries:
+        get_posts(ids)
+    assert len(queries) == 1
+    with CaptureQueriesContext(connection) as queries:
+        posts = get_posts(ids)
+    assert not queries
+    assert [post.pk for post in posts] == ids
+    for post in posts:
+        original = expected[post.pk]
+        assert post.title == original.title
+        assert post.excerpt == original.excerpt
+        assert post.pub_date == original.pub_date
+        assert post.author.username == original.author.username
+        assert post.category.slug == original.category.slug
+        assert post.location.name == original.location.name
+        assert post.comment_count == original.comment_count
+
+
+def test_warm_index_page_reads_no_posts(
+        monkeypatch, client, many_posts_with_published_locations):
+    # Страница целиком не кэшируется: проверяется кэш данных под ней.
+    monkeypatch.setattr(DonutCacheMixin, 'donut_timeout', 0)
+    url = reverse('blog:index')
+    client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert not [
+        query for query in queries.captured_queries
+        if '"blog_post"' in query['sql']
+        and query['sql'].startswith('SELECT')
+        and 'blog_archivemonth' not in query['sql']
+    ]
+    assert len(response.context['page_obj']) == 10
+
+
+def test_deferred_post_appears_without_invalidation(
+        monkeypatch, many_posts_with_published_locations):
+    post = many_posts_with_published_locations[0]
+    post.pub_date = timezone.now() + timedelta(hours=1)
+    post.save()
+    ids, _ = get_post_ids('index', {})
+    assert post.pk not in ids
+    later = (timezone.now() + timedelta(hours=2)).timestamp()
+    monkeypatch.setattr('blog.post_cache.time', lambda: later)
+    with CaptureQueriesContext(connection) as queries:
+        ids, _ = get_post_ids('index', {})
+    assert not queries
+    assert ids[0] == post.pk
+
+
+def test_comment_invalidates_card(
+        mixer, user, many_posts_with_published_locations):
+    post = many_posts_with_published_locations[0]
+    get_posts([post.pk])
+    mixer.blend('blog.Comment', post=post, author=user)
+    assert get_posts([post.pk])[0].comment_count == 1
+
+
+def test_hidden_post_not_fetched_from_stale_ids(
+        many_posts_with_published_locations):
+    post = many_posts_with_published_locations[0]
+    ids, _ = get_post_ids('index', {})
+    assert post.pk in ids
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    # Список id ещё не пересчитан, а карточки поста в кэше нет.
+    assert post.pk not in [card.pk for card in get_posts(ids)]
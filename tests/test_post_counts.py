@@ -0,0 +1,68 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_queries(queries):
+    return [
+        query for query in queries.captured_queries
+        if query['sql'].startswith('SELECT COUNT(')
+    ]
+
+
+def _own_profile_url(user):
+    # Своя лента автора не кэшируется списком id и считается стратегией.
+    return reverse('blog:profile', args=(user.username,))
+
+
+def test_cached_count_skips_count_query(
+        user, user_client, many_posts_with_published_locations):
+    url = _own_profile_url(user)
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url)
+    assert len(_count_queries(queries)) == 1
+    assert response.context['paginator'].count == 20
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url, {'page': 2})
+    assert not _count_queries(queries)
+    assert len(response.context['page_obj']) == 10
+
+
+def test_cached_count_invalidated_on_unpublish(
+        client, many_posts_with_published_locations):
+    url = reverse('blog:index')
+    client.get(url)
+    post = many_posts_with_published_locations[0]
+    post.is_published = False
+    post.save()
+    assert client.get(url).context['paginator'].count == 19
+
+
+@override_settings(POST_COUNT_STRATEGY='estimated')
+def test_estimated_count_from_archive_buckets(
+        client, many_posts_with_published_locations):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('blog:index'))
+    assert not _count_queries(queries)
+    assert response.context['paginator'].count == 20
+
+
+@override_settings(POST_COUNT_STRATEGY='exact')
+def test_exact_count_every_request(
+        user, user_client, many_posts_with_published_locations):
+    url = _own_profile_url(user)
+    user_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get(url)
+    assert len(_count_queries(queries)) == 1
+
+
+def test_cached_id_list_counts_without_query(
+        client, many_posts_with_published_locations):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('blog:index'))
+    assert not _count_queries(queries)
+    assert response.context['paginator'].count == 20
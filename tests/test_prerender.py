@@ -0,0 +1,48 @@
+import gzip
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test.utils import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def prerendered(tmp_path):
+    with override_settings(PRERENDER_ROOT=tmp_path):
+        call_command('prerender_pages', stdout=StringIO())
+        yield tmp_path
+
+
+def test_prerender_writes_pages(prerendered):
+    for name in ('about', 'rules', '404', '500', '403csrf'):
+        assert (prerendered / f'{name}.anonymous.html').exists()
+        assert (prerendered / f'{name}.user.html').exists()
+    assert (prerendered / 'about.anonymous.html.gz').exists()
+    assert not (prerendered / '404.anonymous.html.gz').exists()
+
+
+def test_static_pages_served_without_rendering(
+        prerendered, client, user_client, user, django_assert_num_queries):
+    response = client.get('/pages/about/')
+    assert response.status_code == 200
+    assert not response.templates
+    assert 'Войти' in response.content.decode('utf-8')
+
+    response = client.get('/pages/rules/', HTTP_ACCEPT_ENCODING='gzip')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Наши правила' in gzip.decompress(response.content).decode()
+
+    response = user_client.get('/pages/about/')
+    content = response.content.decode('utf-8')
+    assert not response.templates
+    assert f'/profile/{user.username}/' in content
+    assert 'placeholder' not in content
+
+
+def test_error_page_served_prerendered(prerendered, client):
+    response = client.get('/no-such-page/')
+    assert response.status_code == 404
+    assert 'http://testserver/no-such-page/' in response.content.decode()
+    assert 'placeholder' not in response.content.decode()
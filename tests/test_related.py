@@ -0,0 +1,68 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Post, RelatedPost
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def similar_posts(mixer, user, published_category):
+    texts = (
+        ('Горные походы', 'Маршруты горных походов и снаряжение для гор'),
+        ('Снаряжение для гор', 'Выбираем снаряжение для горных походов'),
+        ('Рецепт пирога', 'Яблочный пирог с корицей и тестом'),
+        ('Пирог с яблоками', 'Тесто для яблочного пирога и корица'),
+    )
+    return [
+        mixer.blend(
+            'blog.Post',
+            title=title,
+            text=text,
+            author=user,
+            category=published_category,
+            is_published=True,
+        )
+        for title, text in texts
+    ]
+
+
+def test_detail_shows_related_posts_in_one_query(
+        client, similar_posts):
+    first, second, *_ = similar_posts
+    RelatedPost.objects.create(post=first, related=second, rank=0, score=0.9)
+    url = reverse('blog:post_detail', kwargs={'post_id': first.pk})
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    related_queries = [
+        query for query in queries.captured_queries
+        if 'blog_relatedpost' in query['sql']
+    ]
+    assert len(related_queries) == 1
+    assert list(response.context['related_posts']) == [second]
+    assert second.title in response.content.decode('utf-8')
+
+
+def test_related_posts_hide_unpublished(client, similar_posts):
+    first, second, *_ = similar_posts
+    RelatedPost.objects.create(post=first, related=second, rank=0, score=0.9)
+    Post.objects.filter(pk=second.pk).update(is_published=False)
+    response = client.get(
+        reverse('blog:post_detail', kwargs={'post_id': first.pk})
+    )
+    assert not response.context['related_posts']
+
+
+def test_rebuild_related_groups_similar_texts(similar_posts):
+    pytest.importorskip('numpy')
+    from blog.related import rebuild_related
+
+    mountains, gear, pie, apple_pie = similar_posts
+    assert rebuild_related(k=1) == 4
+    nearest = dict(
+        RelatedPost.objects.filter(rank=0).values_list('post', 'related')
+    )
+    assert nearest[mountains.pk] == gear.pk
+    assert nearest[pie.pk] == apple_pie.pk
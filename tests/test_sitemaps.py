@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from blog import sitemaps
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def sitemap_root(tmp_path):
+    with override_settings(SITEMAP_ROOT=tmp_path):
+        yield tmp_path
+
+
+def _content(response):
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+def test_sitemap_index_lists_sections(client, post_with_published_location):
+    content = _content(client.get('/sitemap.xml'))
+    for section in ('posts', 'categories', 'profiles'):
+        assert f'/sitemaps/{section}/1.xml' in content
+
+
+def test_posts_sitemap(
+        client, post_with_published_location, future_posts,
+        posts_with_unpublished_category):
+    post = post_with_published_location
+    content = _content(client.get('/sitemaps/posts/1.xml'))
+    assert f'http://testserver/posts/{post.id}/' in content
+    assert f'<lastmod>{post.pub_date.date().isoformat()}</lastmod>' in content
+    for hidden in future_posts + posts_with_unpublished_category:
+        assert f'/posts/{hidden.id}/</loc>' not in content
+    assert client.get('/sitemaps/posts/2.xml').status_code == 404
+    assert client.get('/sitemaps/unknown/1.xml').status_code == 404
+
+
+def test_sitemap_served_from_disk_and_invalidated(
+        client, mixer, user, published_category, post_with_published_location,
+        sitemap_root):
+    _content(client.get('/sitemaps/posts/1.xml'))
+    assert list(sitemap_root.rglob('posts-1.xml'))
+    with CaptureQueriesContext(connection) as captured:
+        _content(client.get('/sitemaps/posts/1.xml'))
+    assert not [
+        query for query in captured.captured_queries
+        if 'blog_post' in query['sql']
+    ]
+
+    new_post = mixer.blend(
+        'blog.Post', author=user, category=published_category
+    )
+    content = _content(client.get('/sitemaps/posts/1.xml'))
+    assert f'/posts/{new_post.id}/' in content
+    assert len(list(sitemap_root.rglob('posts-1.xml'))) == 1
+
+
+def test_deferred_post_appears_when_published(
+        client, monkeypatch, mixer, user, published_category,
+        post_with_published_location):
+    deferred = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    content = _content(client.get('/sitemaps/posts/1.xml'))
+    assert f'/posts/{deferred.id}/' not in content
+    later = (timezone.now() + timedelta(hours=2)).timestamp()
+    monkeypatch.setattr('blog.sitemaps.time', lambda: later)
+    monkeypatch.setattr(
+        'blog.sitemaps.timezone.now',
+        lambda: timezone.datetime.fromtimestamp(later, timezone.utc),
+    )
+    content = _content(client.get('/sitemaps/posts/1.xml'))
+    assert f'/posts/{deferred.id}/' in content
+
+
+def test_directory_removed_during_build(
+        client, monkeypatch, post_with_published_location):
+    write_atomic = sitemaps._write_atomic
+
+    def write_and_invalidate(path, lines):
+        write_atomic(path, lines)
+        sitemaps.invalidate_sitemaps()
+
+    monkeypatch.setattr(sitemaps, '_write_atomic', write_and_invalidate)
+    response = client.get('/sitemaps/posts/1.xml')
+    assert response.status_code == 200
+    post = post_with_published_location
+    assert f'/posts/{post.id}/' in b''.join(response).decode('utf-8')
@@ -0,0 +1,132 @@
+from threading import Barrier, Lock, Thread
+from time import sleep
+
+from django.core.cache import cache
+
+from blog.cache import (
+    bump_version,
+    get_or_rebuild,
+    get_version,
+    get_versions,
+    rebuild_lock,
+)
+from core.cache import TieredCache
+
+WORKERS = 8
+KEY = 'blog:test:stampede'
+
+
+class SlowRebuild:
+    """Долгий пересчёт, который считает свои вызовы."""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        sleep(0.2)
+        return calls
+
+
+def _run_concurrently(rebuild, version=None, timeout=60):
+    barrier = Barrier(WORKERS)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(get_or_rebuild(KEY, rebuild, timeout, version))
+
+    threads = [Thread(target=worker) for _ in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_cold_key_rebuilt_once():
+    rebuild = SlowRebuild()
+    assert _run_concurrently(rebuild) == [1] * WORKERS
+    assert rebuild.calls == 1
+
+
+def test_one_rebuild_per_expiry_others_serve_stale():
+    rebuild = SlowRebuild()
+    _run_concurrently(rebuild, version=1)
+    value, version, expires, duration = cache.get(KEY)
+    cache.set(KEY, (value, version, 0, duration))
+    results = _run_concurrently(rebuild, version=1)
+    assert rebuild.calls == 2
+    assert sorted(results) == [1] * (WORKERS - 1) + [2]
+
+
+def test_version_change_rebuilt_once():
+    rebuild = SlowRebuild()
+    _run_concurrently(rebuild, version=1)
+    results = _run_concurrently(rebuild, version=2)
+    assert rebuild.calls == 2
+    assert results.count(2) == 1
+    assert get_or_rebuild(KEY, rebuild, 60, 2) == 2
+
+
+def test_version_change_rebuilt_once_across_workers(monkeypatch):
+    # Два процесса: у каждого своя память, кэш shared общий.
+    workers = [
+        TieredCache(f'test-stampede-{index}', {'OPTIONS': {}})
+        for index in range(2)
+    ]
+    for worker in workers:
+        worker.clear()
+    rebuild = SlowRebuild()
+
+    def get(worker, version):
+        monkeypatch.setattr('blog.cache.cache', worker)
+        return get_or_rebuild(KEY, rebuild, 60, version)
+
+    for worker in workers:
+        assert get(worker, 1) == 1
+    assert get(workers[0], 2) == 2
+    # Копия второго процесса старой версии, но пересчитывать не нужно.
+    assert get(workers[1], 2) == 2
+    assert get(workers[1], 2) == 2
+    assert rebuild.calls == 2
+
+
+def test_early_refresh_near_expiry(monkeypatch):
+    rebuild = SlowRebuild()
+    get_or_rebuild(KEY, rebuild, 60)
+    monkeypatch.setattr('blog.cache.random', lambda: 0)
+    assert get_or_rebuild(KEY, rebuild, 60) == 1
+    value, version, expires, duration = cache.get(KEY)
+    cache.set(KEY, (value, version, expires - 60 + duration, duration))
+    monkeypatch.setattr('blog.cache.random', lambda: 0.99)
+    assert get_or_rebuild(KEY, rebuild, 60) == 2
+
+
+def test_lock_released_only_by_owner():
+    lock_key = f'{KEY}:lock'
+    cache.delete(lock_key)
+    with rebuild_lock(KEY) as acquired:
+        assert acquired
+        # Блокировка истекла, и её взял другой воркер.
+        cache.set(lock_key, 'other')
+    assert cache.get(lock_key) == 'other'
+    cache.delete(lock_key)
+    with rebuild_lock(KEY) as acquired:
+        assert acquired
+    assert cache.get(lock_key) is None
+
+
+def test_missing_versions_seeded_from_time():
+    versions = get_versions(['test:first', 'test:second'])
+    assert all(version > 1 for version in versions.values())
+    assert get_version('test:first') == versions['test:first']
+    cache.delete('blog:version:test:first')
+    bump_version('test:second')
+    # После вытеснения ключа версия не возвращается к старым номерам.
+    assert get_versions(['test:first'])['test:first'] >= (
+        versions['test:first']
+    )
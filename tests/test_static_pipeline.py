@@ -0,0 +1,55 @@
+import gzip
+import re
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test.utils import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def static_root(tmp_path):
+    with override_settings(STATIC_ROOT=tmp_path):
+        call_command('collectstatic', interactive=False, stdout=StringIO())
+        yield tmp_path
+
+
+def _stylesheet_url(client):
+    content = client.get('/').content.decode('utf-8')
+    return re.search(r'href="(/static/css/bootstrap[^"]*\.css)"', content)[1]
+
+
+def test_collectstatic_writes_hashed_and_compressed(static_root):
+    assert (static_root / 'staticfiles.json').exists()
+    hashed = [
+        path for path in (static_root / 'css').iterdir()
+        if re.fullmatch(r'bootstrap\.min\.[0-9a-f]{12}\.css', path.name)
+    ]
+    assert hashed
+    assert hashed[0].with_name(hashed[0].name + '.gz').exists()
+
+
+def test_hashed_static_served_compressed_with_far_future_cache(
+        static_root, client):
+    url = _stylesheet_url(client)
+    assert re.search(r'\.[0-9a-f]{12}\.css$', url)
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Content-Type'] == 'text/css'
+    assert 'immutable' in response.headers['Cache-Control']
+    body = gzip.decompress(b''.join(response.streaming_content))
+    assert body.startswith(b'@charset')
+
+    response = client.get(url)
+    assert 'Content-Encoding' not in response.headers
+
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0, deflate')
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_static_falls_back_without_manifest(client, tmp_path):
+    with override_settings(STATIC_ROOT=tmp_path):
+        assert _stylesheet_url(client) == '/static/css/bootstrap.min.css'
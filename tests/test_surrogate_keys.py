@@ -0,0 +1,167 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from threading import Event, Thread
+
+import pytest
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from blog.purge import key_versions, purge_queue
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def purge_server():
+    """Локальная замена прокси: запоминает присланные ключи."""
+    purged = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            purged.append(set(self.headers['Surrogate-Key'].split()))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f'http://127.0.0.1:{server.server_port}/purge'
+    with override_settings(SURROGATE_PURGER={
+        'BACKEND': 'blog.purge.HttpPurger',
+        'OPTIONS': {'url': url},
+    }):
+        yield purged
+    server.shutdown()
+    server.server_close()
+
+
+def _keys(response):
+    return set(response['Surrogate-Key'].split())
+
+
+def test_index_keys(client, post_with_published_location):
+    post = post_with_published_location
+    keys = _keys(client.get(reverse('blog:index')))
+    assert keys == {
+        'posts',
+        f'post-{post.pk}',
+        f'author-{post.author_id}',
+        f'category-{post.category.slug}',
+        f'location-{post.location_id}',
+    }
+
+
+def test_category_and_profile_keys(client, post_with_published_location):
+    post = post_with_published_location
+    response = client.get(
+        reverse('blog:category_posts', args=(post.category.slug,))
+    )
+    assert f'category-{post.category.slug}' in _keys(response)
+    response = client.get(
+        reverse('blog:profile', args=(post.author.username,))
+    )
+    assert f'author-{post.author_id}' in _keys(response)
+
+
+def test_detail_keys_include_commenters(
+        mixer, another_user, client, post_with_published_location):
+    post = post_with_published_location
+    mixer.blend('blog.Comment', post=post, author=another_user)
+    keys = _keys(client.get(post.get_absolute_url()))
+    assert {f'post-{post.pk}', f'author-{another_user.pk}'} <= keys
+    assert 'posts' not in keys
+
+
+def test_post_save_purges_keys(
+        purge_server, django_capture_on_commit_callbacks,
+        post_with_published_location):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        post.title = 'Новый заголовок'
+        post.save()
+    purge_queue.flush()
+    assert purge_server == [{'posts', f'post-{post.pk}', 'sitemaps'}]
+
+
+def test_comment_and_category_purge(
+        purge_server, django_capture_on_commit_callbacks, mixer, user,
+        post_with_published_location):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend('blog.Comment', post=post, author=user)
+    purge_queue.flush()
+    assert purge_server == [{f'post-{post.pk}'}]
+    category = post.category
+    old_slug = category.slug
+    purge_server.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        category.slug = 'new-slug'
+        category.save()
+    purge_queue.flush()
+    assert purge_server == [
+        {'posts', f'category-{old_slug}', 'category-new-slug', 'sitemaps'}
+    ]
+
+
+def test_purge_waits_for_commit(
+        purge_server, django_capture_on_commit_callbacks,
+        post_with_published_location):
+    with django_capture_on_commit_callbacks() as callbacks:
+        post_with_published_location.save()
+    purge_queue.flush()
+    assert purge_server == []
+    assert callbacks
+
+
+def test_versions_bumped_again_after_commit(
+        django_capture_on_commit_callbacks, post_with_published_location):
+    key = f'post-{post_with_published_location.pk}'
+    with django_capture_on_commit_callbacks() as callbacks:
+        post_with_published_location.save()
+    # Страница, отрендеренная до фиксации, кэшируется с этими версиями.
+    before_commit = key_versions({key})
+    for callback in callbacks:
+        callback()
+    assert key_versions({key}) != before_commit
+    purge_queue.flush()
+
+
+def test_slow_proxy_does_not_block_save(
+        monkeypatch, django_capture_on_commit_callbacks,
+        post_with_published_location):
+    started = Event()
+    release = Event()
+
+    def slow_purge(self, keys):
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr('blog.purge.NullPurger.purge', slow_purge)
+    with django_capture_on_commit_callbacks(execute=True):
+        post_with_published_location.save()
+    # Сохранение уже завершилось, а очистка ещё идёт в фоне.
+    assert started.wait(5)
+    release.set()
+    purge_queue.flush()
+
+
+def test_keyed_responses_have_bounded_proxy_lifetime(
+        client, tmp_path, post_with_published_location):
+    post = post_with_published_location
+    for url, keys in (
+        (reverse('blog:index'), {'posts'}),
+        (reverse('blog:feed'), {'posts'}),
+        (reverse('blog:api_posts'), {'posts'}),
+        (
+            reverse('blog:api_post_detail', args=(post.pk,)),
+            {f'post-{post.pk}'},
+        ),
+        (reverse('blog:api_comments', args=(post.pk,)), {f'post-{post.pk}'}),
+        (reverse('blog:sitemap_index'), {'sitemaps'}),
+    ):
+        with override_settings(SITEMAP_ROOT=tmp_path):
+            response = client.get(url)
+        assert keys <= _keys(response), url
+        assert 's-maxage=' in response['Cache-Control'], url
@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Post, Tag
+from blog.tags import get_or_create_tags, recount_tags
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count(slug):
+    return Tag.objects.get(slug=slug).post_count
+
+
+@pytest.fixture
+def tagged_posts(mixer, user, published_category):
+    posts = mixer.cycle(12).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(
+            timezone.now() - timedelta(hours=hours) for hours in range(1, 13)
+        ),
+    )
+    tag, = get_or_create_tags(['python'])
+    for post in posts:
+        post.tags.add(tag)
+    return posts
+
+
+def test_tag_counts_follow_visibility(tagged_posts, mixer, user):
+    assert _count('python') == 12
+    first = tagged_posts[0]
+    first.is_published = False
+    first.save()
+    assert _count('python') == 11
+    first.is_published = True
+    first.save()
+    tagged_posts[1].delete()
+    assert _count('python') == 11
+    tagged_posts[2].tags.clear()
+    assert _count('python') == 10
+    future = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=first.category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    future.tags.add(Tag.objects.get(slug='python'))
+    assert _count('python') == 10
+    category = first.category
+    category.is_published = False
+    category.save()
+    assert _count('python') == 0
+
+
+def test_recount_matches_incremental(tagged_posts):
+    tagged_posts[0].tags.clear()
+    Tag.objects.update(post_count=0)
+    recount_tags()
+    assert _count('python') == 11
+
+
+def test_tag_page_cursor_pagination(client, tagged_posts):
+    url = reverse('blog:tag_posts', kwargs={'tag_slug': 'python'})
+    response = client.get(url)
+    first_page = response.context['posts']
+    assert first_page == tagged_posts[:10]
+    response = client.get(url, {'cursor': response.context['next_cursor']})
+    assert response.context['posts'] == tagged_posts[10:]
+    assert 'next_cursor' not in response.context
+    assert client.get(url, {'cursor': 'bad'}).status_code == 404
+
+
+def test_tag_cloud_on_index(client, tagged_posts):
+    content = client.get(reverse('blog:index')).content.decode('utf-8')
+    assert reverse('blog:tag_posts', kwargs={'tag_slug': 'python'}) in content
+
+
+def test_post_form_saves_tags(user_client, published_category):
+    response = user_client.post(
+        reverse('blog:create_post'),
+        {
+            'title': 'Заголовок',
+            'text': 'Текст',
+            'pub_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+            'category': published_category.pk,
+            'tags': 'Django, python,  django ',
+        },
+    )
+    assert response.status_code == 302
+    post = Post.objects.get(title='Заголовок')
+    assert sorted(post.tags.values_list('name', flat=True)) == [
+        'django',
+        'python',
+    ]
+    assert _count('django') == 1
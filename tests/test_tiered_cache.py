@@ -0,0 +1,118 @@
+import pytest
+from django.core.cache import caches
+
+from core.cache import TieredCache
+
+
+def _worker(name, **options):
+    """Отдельный процесс: своя память, общий кэш."""
+    options.setdefault('SYNC_INTERVAL', 0)
+    cache = TieredCache(name, {'OPTIONS': options})
+    cache.clear()
+    return cache
+
+
+@pytest.fixture
+def shared():
+    shared = caches['shared']
+    shared.clear()
+    yield shared
+    shared.clear()
+
+
+def test_second_read_served_locally(shared):
+    cache = _worker('test-local')
+    cache.set('blog:card:1', {'title': 'Пост'})
+    # Значение в общем кэше пропало, но копия процесса ещё жива.
+    shared.delete('blog:card:1')
+    assert cache.get('blog:card:1') == {'title': 'Пост'}
+    stats = cache.stats()
+    assert stats['local_hits'] == 1
+    assert stats['local_hit_rate'] == 1
+
+
+def test_get_fresh_replaces_local_copy(shared):
+    first = _worker('test-fresh-first')
+    second = _worker('test-fresh-second')
+    first.set('blog:ids:index', [1])
+    assert second.get('blog:ids:index') == [1]
+    first.set('blog:ids:index', [2, 1])
+    assert second.get('blog:ids:index') == [1]
+    assert second.get_fresh('blog:ids:index') == [2, 1]
+    assert second.get('blog:ids:index') == [2, 1]
+    shared.delete('blog:ids:index')
+    assert second.get_fresh('blog:ids:index') is None
+    assert second.get('blog:ids:index') is None
+
+
+def test_local_copy_is_not_shared_object(shared):
+    cache = _worker('test-copy')
+    cache.set('blog:feed:all', {'items': []})
+    cache.get('blog:feed:all')['items'].append(1)
+    assert cache.get('blog:feed:all') == {'items': []}
+
+
+def test_delete_in_other_worker_invalidates_copy(shared):
+    first = _worker('test-first')
+    second = _worker('test-second')
+    first.set('blog:ids:index', [1, 2])
+    assert second.get('blog:ids:index') == [1, 2]
+    assert second.stats()['shared_hits'] == 1
+    first.delete('blog:ids:index')
+    assert second.get('blog:ids:index') is None
+    assert second.stats()['misses'] == 1
+
+
+def test_fill_keeps_other_copies(shared):
+    first = _worker('test-fill-first')
+    second = _worker('test-fill-second')
+    first.set('blog:card:1', 'пост 1')
+    assert second.get('blog:card:1') == 'пост 1'
+    first.set('blog:card:2', 'пост 2')
+    second.set('blog:card:3', 'пост 3')
+    assert first.get('blog:card:1') == 'пост 1'
+    assert second.get('blog:card:1') == 'пост 1'
+    assert first.stats()['local_hits'] == 1
+    assert second.stats()['local_hits'] == 1
+
+
+def test_lost_event_applied_on_sync(shared, monkeypatch):
+    first = _worker('test-sync-first')
+    second = _worker('test-sync-second', SYNC_INTERVAL=60)
+    first.set('blog:card:1', 'старое')
+    second.get('blog:card:1')
+    # Событие шины не дошло: копию сбросит только сверка версий.
+    monkeypatch.setattr('core.cache.publish', lambda topic, payload: None)
+    first.delete('blog:card:1')
+    assert second.get('blog:card:1') == 'старое'
+    second.tier.synced_at = 0
+    assert second.get('blog:card:1') is None
+
+
+def test_lru_eviction_by_size(shared):
+    cache = _worker('test-lru', MAX_BYTES=1000)
+    for number in range(5):
+        cache.set(f'blog:card:{number}', 'x' * 300)
+    stats = cache.stats()
+    assert stats['bytes'] <= 1000
+    assert stats['evictions'] == 2
+    assert cache.get('blog:card:4') == 'x' * 300
+    assert cache.stats()['local_hits'] == 1
+    assert cache.get('blog:card:0') == 'x' * 300
+    assert cache.stats()['shared_hits'] == 1
+
+
+def test_local_ttl(shared, monkeypatch):
+    cache = _worker('test-ttl', LOCAL_TIMEOUT=5)
+    cache.set('blog:card:1', 'пост')
+    clock = __import__('time').monotonic() + 10
+    monkeypatch.setattr('core.cache.monotonic', lambda: clock)
+    assert cache.get('blog:card:1') == 'пост'
+    assert cache.stats()['shared_hits'] == 1
+
+
+def test_locks_stay_in_shared_cache(shared):
+    cache = _worker('test-lock')
+    assert cache.add('blog:ids:index:lock', 1)
+    assert not cache.add('blog:ids:index:lock', 1)
+    assert not cache.stats()['entries']
@@ -0,0 +1,50 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Post, TrendingPost
+from blog.ranking import rebuild_trending
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def recent_posts(mixer, user, published_category):
+    now = timezone.now()
+    posts = mixer.cycle(3).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=now - timedelta(hours=1),
+    )
+    for post, comments in zip(posts, (1, 3, 0)):
+        mixer.cycle(comments).blend('blog.Comment', post=post, author=user)
+    return posts
+
+
+def test_trending_ranks_by_decayed_comments(client, recent_posts):
+    quiet, popular, silent = recent_posts
+    assert rebuild_trending() == 2
+    response = client.get(reverse('blog:trending'))
+    assert list(response.context['page_obj']) == [popular, quiet]
+
+
+def test_older_activity_weighs_less(recent_posts):
+    quiet, popular, _ = recent_posts
+    popular.comments.update(created_at=timezone.now() - timedelta(days=10))
+    rebuild_trending()
+    scores = dict(TrendingPost.objects.values_list('post_id', 'score'))
+    assert scores[quiet.pk] > scores[popular.pk]
+
+
+def test_trending_respects_visibility(client, recent_posts):
+    _, popular, _ = recent_posts
+    call_command('rank_posts', stdout=StringIO())
+    Post.objects.filter(pk=popular.pk).update(is_published=False)
+    response = client.get(reverse('blog:trending'))
+    assert popular not in response.context['page_obj']
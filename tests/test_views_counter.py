@@ -0,0 +1,130 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.counters import ViewCounter, view_counter
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _detail(client, post):
+    return client.get(reverse('blog:post_detail', kwargs={'post_id': post.pk}))
+
+
+def _flush(counter=view_counter):
+    # Записи применяются со второго сброса, когда они точно дописаны.
+    return counter.flush() + counter.flush()
+
+
+def test_views_buffered_and_flushed_in_batch(
+        client, post_with_published_location):
+    post = post_with_published_location
+    for _ in range(3):
+        assert _detail(client, post).status_code == 200
+    post.refresh_from_db()
+    assert post.views == 0
+    for _ in range(3):
+        view_counter.record(-1)
+    assert view_counter.flush() == 0
+    with CaptureQueriesContext(connection) as queries:
+        assert view_counter.flush() == 2
+    updates = [
+        query for query in queries.captured_queries
+        if query['sql'].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 1
+    post.refresh_from_db()
+    assert post.views == 3
+    assert 'Просмотров: 3' in _detail(client, post).content.decode('utf-8')
+
+
+def test_views_survive_killed_worker(post_with_published_location):
+    post = post_with_published_location
+    worker = ViewCounter()
+    for _ in range(2):
+        worker.record(post.pk)
+    # Воркер убит: его просмотры применяет другой процесс.
+    del worker
+    assert _flush(ViewCounter()) == 1
+    post.refresh_from_db()
+    assert post.views == 2
+
+
+def test_failed_flush_keeps_log(post_with_published_location, monkeypatch):
+    post = post_with_published_location
+    view_counter.record(post.pk)
+    view_counter.flush()
+
+    def fail(deltas):
+        raise DatabaseError
+
+    monkeypatch.setattr('blog.counters.apply_deltas', fail)
+    assert view_counter.flush() == 0
+    monkeypatch.undo()
+    assert view_counter.flush() == 1
+    post.refresh_from_db()
+    assert post.views == 1
+
+
+def test_replayed_log_not_applied_twice(post_with_published_location):
+    post = post_with_published_location
+    view_counter.record(post.pk)
+    shared = caches['shared']
+    entries = shared.get_many([f'blog:views:{view_counter.log}:1'])
+    assert entries
+    _flush()
+    # Сбой после фиксации: записи журнала остались в кэше.
+    shared.set_many(entries)
+    _flush()
+    post.refresh_from_db()
+    assert post.views == 1
+
+
+def test_post_edit_does_not_overwrite_views(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    view_counter.record(post.pk)
+    _flush()
+    post.title = 'Новый заголовок'
+    post.save_without_views()
+    post.refresh_from_db()
+    assert post.views == 1
+    view_counter.record(post.pk)
+    _flush()
+    response = user_client.post(
+        reverse('blog:edit_post', kwargs={'post_id': post.pk}),
+        {
+            'title': 'Заголовок из формы',
+            'text': post.text,
+            'pub_date': post.pub_date.strftime('%Y-%m-%dT%H:%M'),
+            'category': post.category_id,
+        },
+    )
+    assert response.status_code == 302
+    post.refresh_from_db()
+    assert post.title == 'Заголовок из формы'
+    assert post.views == 2
+
+
+def test_deleted_post_saved_again(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).delete()
+    post.save(force_insert=True)
+    assert Post.objects.filter(pk=post.pk).exists()
+
+
+def test_flush_views_command(post_with_published_location):
+    post = post_with_published_location
+    view_counter.record(post.pk)
+    call_command('flush_views', stdout=StringIO())
+    out = StringIO()
+    call_command('flush_views', stdout=out)
+    assert 'Обновлено счётчиков: 1' in out.getvalue()
+    post.refresh_from_db()
+    assert post.views == 1